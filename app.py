@@ -1,16 +1,17 @@
 import streamlit as st
+import hashlib
+import html
+import logging
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from dotenv import load_dotenv
 
+logger = logging.getLogger(__name__)
+
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 
-from src.ingestion import EarthquakeLoader, TextCleaner, TextSplitter
-from src.vectorizer import EmbeddingModel, VectorStoreManager
-from src.retrieval import Retriever
-from src.rag import RAGChain
-
 # Page config
 st.set_page_config(
     page_title="Earthquake RAG System",
@@ -45,47 +46,123 @@ h1 { color: #001A43; }
 """, unsafe_allow_html=True)
 
 
+INDEX_CACHE_DIR = os.path.join(os.path.dirname(__file__), ".cache", "faiss_index")
+INDEX_HASH_FILE = os.path.join(INDEX_CACHE_DIR, "data.sha256")
+
+
+def _data_fingerprint(entries, embedding_model):
+    """SHA-256 of (filename, mtime, size) for the data files plus the embedding setup."""
+    digest = hashlib.sha256()
+    digest.update(f"{embedding_model.model_name}|{embedding_model.precision}\n".encode())
+    for entry in sorted(entries, key=lambda e: e.name):
+        stat = entry.stat()
+        digest.update(f"{entry.name}|{stat.st_mtime_ns}|{stat.st_size}\n".encode())
+    return digest.hexdigest()
+
+
+def _load_cached_index(manager, fingerprint):
+    """Load the persisted index if it was built from the same data. Returns True on success."""
+    try:
+        with open(INDEX_HASH_FILE, "r", encoding="utf-8") as f:
+            if f.read().strip() != fingerprint:
+                return False
+        manager.load(INDEX_CACHE_DIR)
+        return True
+    except Exception:
+        return False
+
+
+def _save_cached_index(manager, fingerprint):
+    """Persist the index, then its fingerprint (so a partial write is never trusted)."""
+    try:
+        if os.path.exists(INDEX_HASH_FILE):
+            os.remove(INDEX_HASH_FILE)
+        manager.save(INDEX_CACHE_DIR)
+        with open(INDEX_HASH_FILE, "w", encoding="utf-8") as f:
+            f.write(fingerprint)
+    except Exception as e:
+        # The index is already built in memory: a failed cache write only
+        # costs a rebuild on the next start
+        logger.warning("Could not cache the vector index", exc_info=True)
+        st.warning(f"Could not cache the vector index: {str(e)}")
+
+
+def _unique_sources(sources):
+    """Drop chunks of an already listed event, preserving first-seen order."""
+    seen = set()
+    unique = []
+    for doc in sources:
+        # Rows without an event ID are only deduplicated on identical content
+        key = doc.metadata.get("event_id") or doc.page_content
+        if key not in seen:
+            seen.add(key)
+            unique.append(doc)
+    return unique
+
+
 @st.cache_resource
 def initialize_rag_system():
     """Initialize the Earthquake RAG System."""
+    # Heavy imports (torch, FAISS, Groq client) are deferred to first use
+    from src.ingestion import ingest_file
+    from src.vectorizer import VectorStoreManager, get_embedding_model
+    from src.retrieval import Retriever
+    from src.rag import RAGChain
+
     load_dotenv()
 
-    with st.spinner("🌋 Loading earthquake catalog and building index..."):
-        loader = EarthquakeLoader()
-        cleaner = TextCleaner()
-        splitter = TextSplitter(chunk_size=400, chunk_overlap=40)
+    # Shared model: loaded once per process, reused across cache invalidations
+    embedding_model = get_embedding_model()
 
+    with st.spinner("🌋 Loading earthquake catalog and building index..."):
         data_dir = os.path.join(os.path.dirname(__file__), "data")
         all_chunks = []
         loaded_files = []
 
-        # Load earthquake datasets (TXT or CSV)
-        for filename in os.listdir(data_dir):
-            if filename.lower().endswith(".txt") or filename.lower().endswith(".csv"):
-                file_path = os.path.join(data_dir, filename)
-                try:
-                    raw_docs = loader.load_txt(file_path)
-                    for doc in raw_docs:
-                        doc.page_content = cleaner.clean(doc.page_content)
-                    file_chunks = splitter.split_documents(raw_docs)
-                    all_chunks.extend(file_chunks)
-                    loaded_files.append(filename)
-                except Exception as e:
-                    st.warning(f"Could not load {filename}: {str(e)}")
-
-        if not all_chunks:
-            raise Exception("No earthquake data found in /data folder.")
-
-        # Build vector index
-        embedding_model = EmbeddingModel()
+        # Load earthquake datasets (TXT or CSV); DirEntry caches stat() results
+        with os.scandir(data_dir) as it:
+            entries = [
+                entry for entry in it
+                if entry.is_file() and entry.name.lower().endswith((".txt", ".csv"))
+            ]
+
         manager = VectorStoreManager(embedding_model)
-        manager.create_index(all_chunks)
+        fingerprint = _data_fingerprint(entries, embedding_model)
+
+        # Reuse the index from a previous run when /data is unchanged
+        if _load_cached_index(manager, fingerprint):
+            loaded_files = [entry.name for entry in entries]
+        else:
+            # Files are independent: load, clean and split them in parallel
+            if entries:
+                workers = min(len(entries), os.cpu_count() or 1)
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    futures = [
+                        (entry.name, executor.submit(ingest_file, entry.path, 400, 40))
+                        for entry in entries
+                    ]
+                    for filename, future in futures:
+                        try:
+                            all_chunks.extend(future.result())
+                            loaded_files.append(filename)
+                        except Exception as e:
+                            st.warning(f"Could not load {filename}: {str(e)}")
+
+            if not all_chunks:
+                raise Exception("No earthquake data found in /data folder.")
+
+            # Build vector index
+            manager.create_index(all_chunks)
+            _save_cached_index(manager, fingerprint)
+
+        # Indexed (deduplicated) chunks: the same figure whether or not the cache was hit
+        total_chunks = manager.index.ntotal
 
         retriever = Retriever(vector_store_manager=manager)
 
         # Save info to session state
         st.session_state.loaded_files = loaded_files
-        st.session_state.total_chunks = len(all_chunks)
+        st.session_state.total_chunks = total_chunks
 
         return RAGChain(retriever=retriever)
 
@@ -143,8 +220,8 @@ Powered by:
                         st.markdown(f"""
 <div class="source-box">
 <strong>Event {i}</strong><br>
-ID: {src['event_id']}<br>
-<em>{src['content'][:200]}...</em>
+ID: {html.escape(src['event_id'])}<br>
+<em>{html.escape(src['content'][:200])}...</em>
 </div>
                         """, unsafe_allow_html=True)
 
@@ -157,47 +234,48 @@ ID: {src['event_id']}<br>
 
         # Assistant response
         with st.chat_message("assistant"):
-            with st.spinner("🔍 Analyzing earthquake data..."):
-                try:
-                    result = rag_chain.answer(prompt)
-                    answer = result["answer"]
-                    sources = result["source_documents"]
-
-                    # Show answer
-                    st.markdown(answer)
-
-                    # Show sources
-                    if sources:
-                        with st.expander("Event Sources"):
-                            for i, doc in enumerate(sources, 1):
-                                st.markdown(f"""
+            try:
+                with st.spinner("🔍 Analyzing earthquake data..."):
+                    documents = rag_chain.select_context(rag_chain.retriever.retrieve(prompt))
+
+                # Show answer, token by token as the model produces it
+                answer = st.write_stream(rag_chain.stream(prompt, documents=documents))
+
+                # Overlapping chunks of the same event are listed once
+                sources = _unique_sources(documents)
+
+                # Show sources
+                if sources:
+                    with st.expander("Event Sources"):
+                        for i, doc in enumerate(sources, 1):
+                            st.markdown(f"""
 <div class="source-box">
 <strong>Event {i}</strong><br>
-ID: {doc.metadata.get('event_id', 'unknown')}<br>
-<em>{doc.page_content[:200]}...</em>
+ID: {html.escape(doc.metadata.get('event_id', 'unknown'))}<br>
+<em>{html.escape(doc.page_content[:200])}...</em>
 </div>
-                                """, unsafe_allow_html=True)
-
-                    # Save to history
-                    st.session_state.messages.append({
-                        "role": "assistant",
-                        "content": answer,
-                        "sources": [
-                            {
-                                "event_id": doc.metadata.get("event_id", "unknown"),
-                                "content": doc.page_content
-                            }
-                            for doc in sources
-                        ]
-                    })
-
-                except Exception as e:
-                    error_msg = f"Error: {str(e)}"
-                    st.error(error_msg)
-                    st.session_state.messages.append({
-                        "role": "assistant",
-                        "content": error_msg
-                    })
+                            """, unsafe_allow_html=True)
+
+                # Save to history
+                st.session_state.messages.append({
+                    "role": "assistant",
+                    "content": answer,
+                    "sources": [
+                        {
+                            "event_id": doc.metadata.get("event_id", "unknown"),
+                            "content": doc.page_content
+                        }
+                        for doc in sources
+                    ]
+                })
+
+            except Exception as e:
+                error_msg = f"Error: {str(e)}"
+                st.error(error_msg)
+                st.session_state.messages.append({
+                    "role": "assistant",
+                    "content": error_msg
+                })
 
 
 if __name__ == "__main__":
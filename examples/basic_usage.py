@@ -9,13 +9,16 @@ This script demonstrates how to:
 
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import chain
 from dotenv import load_dotenv
 
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.ingestion import EarthquakeLoader, TextCleaner, TextSplitter
-from src.vectorizer import EmbeddingModel, VectorStoreManager
+from src.ingestion import ingest_file
+from src.vectorizer import VectorStoreManager, get_embedding_model
 from src.retrieval import Retriever
 from src.rag import RAGChain
 
@@ -27,34 +30,28 @@ def main():
     
     # Step 1: Initialize components
     print("1. Initializing components...")
-    loader = EarthquakeLoader()
-    cleaner = TextCleaner()
-    splitter = TextSplitter(chunk_size=500, chunk_overlap=50)
+    ingest = partial(ingest_file, chunk_size=500, chunk_overlap=50)
     
     # Step 2: Load documents
     print("2. Loading file terremoti...")
     data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
     
-    all_chunks = []
-    for filename in os.listdir(data_dir):
-        if filename.endswith('.txt'):
-            file_path = os.path.join(data_dir, filename)
-            print(f"   - Loading: {filename}")
-            
-            # Load and clean
-            raw_docs = loader.load_txt(file_path)
-            for doc in raw_docs:
-                doc.page_content = cleaner.clean(doc.page_content)
-            
-            # Split into chunks
-            chunks = splitter.split_documents(raw_docs)
-            all_chunks.extend(chunks)
+    file_paths = []
+    with os.scandir(data_dir) as it:
+        for entry in it:
+            if entry.is_file() and entry.name.endswith('.txt'):
+                print(f"   - Loading: {entry.name}")
+                file_paths.append(entry.path)
+    
+    # Load, clean and split each file in its own worker process
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        all_chunks = list(chain.from_iterable(executor.map(ingest, file_paths)))
     
     print(f"   Total chunks: {len(all_chunks)}")
     
     # Step 3: Create vector index
     print("3. Creating vector index...")
-    embedding_model = EmbeddingModel()
+    embedding_model = get_embedding_model()
     manager = VectorStoreManager(embedding_model)
     manager.create_index(all_chunks)
     print("   Index created!")
@@ -74,9 +71,11 @@ def main():
           "Terremoti recenti vicino alla Sicilia o Calabria"
     ]
     
-    for i, question in enumerate(questions, 1):
+    # One batched retrieval + one batched LLM call for all questions
+    results = rag_chain.answer_batch(questions)
+
+    for i, (question, result) in enumerate(zip(questions, results), 1):
         print(f"Question {i}: {question}")
-        result = rag_chain.answer(question)
         print(f"Answer: {result['answer']}\n")
         print(f"Sources: {len(result['source_documents'])} documents\n")
         print("-" * 50 + "\n")
@@ -11,7 +11,7 @@ PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.append(PROJECT_ROOT)
 
 from langchain.schema import Document
-from src.vectorizer import EmbeddingModel, VectorStoreManager
+from src.vectorizer import VectorStoreManager, get_embedding_model
 from src.retrieval import Retriever
 from src.ingestion import TextCleaner, TextSplitter
 
@@ -410,7 +410,7 @@ def main():
 
     chunks = splitter.split_documents(raw_events)
 
-    embedding_model = EmbeddingModel()
+    embedding_model = get_embedding_model()
     vector_manager = VectorStoreManager(embedding_model)
     vector_manager.create_index(chunks)
 
@@ -1,15 +1,45 @@
 import os
 import csv
-import re
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, List
+import numpy as np
 from langchain.schema import Document
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
+try:
+    import numba
+except ImportError:  # numba is optional: fall back to str split/join
+    numba = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+except ImportError:  # pyarrow is optional: fall back to the csv module
+    pa = None
+
 
 # ============================================================
 #   EARTHQUAKE DATA LOADER (TXT with pipe delimiter)
 # ============================================================
 
+# (label, column) pairs rendered as "<label><value>" into each event text
+_EVENT_FIELDS = (
+    ("Event ID: ", "EventID"),
+    ("\nDate/Time: ", "Time"),
+    ("\nLatitude: ", "Latitude"),
+    ("\nLongitude: ", "Longitude"),
+    ("\nDepth (km): ", "Depth_Km"),
+    ("\nMagnitude: ", "Magnitude"),
+    (" (", "MagType"),
+    (")\nLocation: ", "EventLocationName"),
+    ("\nEvent Type: ", "EventType"),
+    ("\nAuthor: ", "Author"),
+    ("\nCatalog: ", "Catalog"),
+)
+_EVENT_SUFFIX = "\n"
+
+
 class EarthquakeLoader:
 
 
@@ -19,31 +49,111 @@ class EarthquakeLoader:
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"Earthquake file not found: {file_path}")
 
+        if pa is not None:
+            try:
+                return self._load_txt_arrow(file_path)
+            except pa.ArrowInvalid:
+                # Invalid UTF-8 or ragged rows: the csv module is more lenient
+                pass
+
+        return self._load_txt_csv(file_path)
+
+    def _load_txt_arrow(self, file_path: str) -> List[Document]:
+        """
+        Columnar path: parse with pyarrow and render every event text
+        with one vectorized string join instead of one f-string per row.
+        """
+        with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+            header = next(csv.reader(f, delimiter="|"), [])
+
+        columns = [col for _, col in _EVENT_FIELDS if col in header]
+        if not columns:
+            raise pa.ArrowInvalid("No earthquake columns found in header.")
+
+        # INGV TXT uses "|" as delimiter; keep every value as raw text
+        table = pa_csv.read_csv(
+            file_path,
+            parse_options=pa_csv.ParseOptions(delimiter="|"),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=columns,
+                column_types={col: pa.string() for col in columns},
+                strings_can_be_null=False,
+            ),
+        )
+        if table.num_rows == 0:
+            return []
+
+        pieces = []
+        for label, col in _EVENT_FIELDS:
+            pieces.append(label)
+            pieces.append(table[col] if col in columns else "")
+        pieces.append(_EVENT_SUFFIX)
+
+        # Last argument is the separator
+        texts = pc.binary_join_element_wise(*pieces, "").to_pylist()
+
+        if "EventID" in columns:
+            event_ids = table["EventID"].to_pylist()
+        else:
+            event_ids = [""] * table.num_rows
+
+        return [
+            Document(page_content=text, metadata={"event_id": event_id})
+            for text, event_id in zip(texts, event_ids)
+        ]
+
+    def _load_txt_csv(self, file_path: str) -> List[Document]:
+        """Row-by-row path using csv.reader and positional column access."""
         documents = []
 
         # INGV TXT uses "|" as delimiter
         with open(file_path, "r", encoding="utf-8", errors="replace") as f:
-            reader = csv.DictReader(f, delimiter="|")
+            reader = csv.reader(f, delimiter="|")
+
+            header = next(reader, None)
+            if header is None:
+                return documents
+            width = len(header)
+
+            # Missing columns read index -1: every row gets a trailing ""
+            (eid_i, time_i, lat_i, lon_i, depth_i, mag_i, magtype_i,
+             loc_i, type_i, author_i, catalog_i) = (
+                header.index(col) if col in header else -1
+                for _, col in _EVENT_FIELDS
+            )
+            padding = [""] * width
 
             for row in reader:
+                if not row:
+                    continue
+
+                # Normalize ragged rows to the header width, then add the "" slot
+                n = len(row)
+                if n < width:
+                    row.extend(padding[n:])
+                elif n > width:
+                    del row[width:]
+                row.append("")
+
+                event_id = row[eid_i]
                 event_text = (
-                    f"Event ID: {row.get('EventID', '')}\n"
-                    f"Date/Time: {row.get('Time', '')}\n"
-                    f"Latitude: {row.get('Latitude', '')}\n"
-                    f"Longitude: {row.get('Longitude', '')}\n"
-                    f"Depth (km): {row.get('Depth_Km', '')}\n"
-                    f"Magnitude: {row.get('Magnitude', '')} ({row.get('MagType', '')})\n"
-                    f"Location: {row.get('EventLocationName', '')}\n"
-                    f"Event Type: {row.get('EventType', '')}\n"
-                    f"Author: {row.get('Author', '')}\n"
-                    f"Catalog: {row.get('Catalog', '')}\n"
+                    f"Event ID: {event_id}\n"
+                    f"Date/Time: {row[time_i]}\n"
+                    f"Latitude: {row[lat_i]}\n"
+                    f"Longitude: {row[lon_i]}\n"
+                    f"Depth (km): {row[depth_i]}\n"
+                    f"Magnitude: {row[mag_i]} ({row[magtype_i]})\n"
+                    f"Location: {row[loc_i]}\n"
+                    f"Event Type: {row[type_i]}\n"
+                    f"Author: {row[author_i]}\n"
+                    f"Catalog: {row[catalog_i]}\n"
                 )
 
                 documents.append(
                     Document(
                         page_content=event_text,
                         metadata={
-                            "event_id": row.get("EventID", "")
+                            "event_id": event_id
                         }
                     )
                 )
@@ -55,11 +165,66 @@ class EarthquakeLoader:
 #   TEXT CLEANER
 # ============================================================
 
+def _str_clean(text: str) -> str:
+    # split/join run in C: no regex engine, no backtracking.
+    # "\r" of "\r\n" is whitespace, so it is trimmed with the line.
+    lines = (" ".join(line.split()) for line in text.split("\n"))
+    return "\n".join(filter(None, lines))
+
+
+if numba is not None:
+
+    @numba.njit(cache=True)
+    def _fold_whitespace(src, out):
+        """
+        Single pass over ASCII bytes with the semantics of _str_clean:
+        whitespace runs inside a line become one space, lines are
+        trimmed and empty lines dropped. Returns bytes written.
+        """
+        n = 0
+        in_line = False    # current line has written content
+        pending = False    # whitespace seen since the last content byte
+        for b in src:
+            if b == 10:
+                in_line = False
+                pending = False
+            elif b == 32 or 9 <= b <= 13 or 28 <= b <= 31:
+                # Same ASCII set str.split() treats as whitespace
+                pending = in_line
+            else:
+                if not in_line:
+                    # Stands in for the "\n" that ended the previous line
+                    if n > 0:
+                        out[n] = 10
+                        n += 1
+                    in_line = True
+                elif pending:
+                    out[n] = 32
+                    n += 1
+                pending = False
+                out[n] = b
+                n += 1
+        return n
+
+    def _c_clean(text: str) -> str:
+        # Non-ASCII text may hold Unicode whitespace (e.g. NBSP) the byte
+        # loop does not know about; isascii() is O(1) on CPython.
+        if not text.isascii():
+            return _str_clean(text)
+        src = np.frombuffer(text.encode("ascii"), dtype=np.uint8)
+        out = np.empty_like(src)
+        n = _fold_whitespace(src, out)
+        return out[:n].tobytes().decode("ascii")
+
+else:
+    _c_clean = _str_clean
+
+
 class TextCleaner:
     """
     Utility class for cleaning raw text:
-    - removes excessive whitespace
-    - collapses repeated line breaks
+    - removes excessive whitespace, trimming each line
+    - drops empty lines (collapses repeated line breaks)
     """
 
     def clean(self, text: str) -> str:
@@ -68,9 +233,13 @@ class TextCleaner:
         if not text:
             return ""
 
-        text = re.sub(r"[ \t]+", " ", text)   # collapse tabs/spaces
-        text = re.sub(r"\n+", "\n", text)     # collapse newlines
-        return text.strip()
+        return _c_clean(text)
+
+    def clean_stream(self, documents: Iterable[Document]) -> Iterator[Document]:
+        """Clean documents in place as they stream in, yielding each one."""
+        for doc in documents:
+            doc.page_content = self.clean(doc.page_content)
+            yield doc
 
 
 # ============================================================
@@ -80,19 +249,101 @@ class TextCleaner:
 class TextSplitter:
 
 
-    def __init__(self, chunk_size: int = 400, chunk_overlap: int = 50):
+    def __init__(self, chunk_size: int = 400, chunk_overlap: int = 50,
+                 length_function: Callable[[str], int] = str.__len__):
 
+        self.chunk_size = chunk_size
+        self.length_function = length_function
         self.splitter = RecursiveCharacterTextSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
-            length_function=len,
+            length_function=length_function,
             is_separator_regex=False,
+            keep_separator=False,
         )
 
+    @classmethod
+    def from_tokenizer(cls, tokenizer, chunk_size: int = 400, chunk_overlap: int = 50) -> "TextSplitter":
+        """Build a splitter whose sizes are measured in tokenizer tokens instead of characters."""
+        # encode is bound as a default argument: a local lookup on every call
+        def token_length(text: str, _encode=tokenizer.encode) -> int:
+            return len(_encode(text))
+
+        return cls(chunk_size=chunk_size, chunk_overlap=chunk_overlap, length_function=token_length)
+
     def split_text(self, text: str) -> List[str]:
         """Split a raw string into smaller chunks."""
         return self.splitter.split_text(text)
 
-    def split_documents(self, documents: List[Document]) -> List[Document]:
-        """Split Document objects into multiple chunked Document objects."""
-        return self.splitter.split_documents(documents)
\ No newline at end of file
+    def split_documents(self, documents: Iterable[Document], workers: int = 1) -> List[Document]:
+        """
+        Split Document objects into multiple chunked Document objects.
+
+        Documents that already fit in one chunk (most INGV rows) are passed
+        through untouched instead of running the separator search.
+
+        Args:
+            documents (Iterable[Document]): documents to split, order preserved
+                (a generator is consumed once).
+            workers (int): processes used to split the long documents. Only
+                worth it for thousands of them; the length function must be
+                picklable (the default is, from_tokenizer's is not).
+        """
+        if workers <= 1:
+            # Streaming: each document is split as it arrives
+            chunks = []
+            for doc in documents:
+                if 0 < self.length_function(doc.page_content) <= self.chunk_size:
+                    chunks.append(doc)
+                else:
+                    chunks.extend(self.splitter.split_documents([doc]))
+            return chunks
+
+        documents = list(documents)
+        fits = [0 < self.length_function(doc.page_content) <= self.chunk_size for doc in documents]
+        long_docs = [[doc] for doc, ok in zip(documents, fits) if not ok]
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pieces = iter(list(executor.map(
+                self.splitter.split_documents, long_docs,
+                chunksize=max(1, len(long_docs) // (4 * workers)),
+            )))
+
+        chunks = []
+        for doc, ok in zip(documents, fits):
+            if ok:
+                chunks.append(doc)
+            else:
+                chunks.extend(next(pieces))
+        return chunks
+
+
+    def split_and_clean(self, doc: Document, cleaner: TextCleaner) -> List[Document]:
+        """
+        Clean one document in place and split it, visiting its text once
+        for the common case: a cleaned row that fits in one chunk is
+        returned as-is, with no separator search.
+        """
+        doc.page_content = cleaner.clean(doc.page_content)
+        if 0 < self.length_function(doc.page_content) <= self.chunk_size:
+            return [doc]
+        return self.splitter.split_documents([doc])
+
+
+# ============================================================
+#   PER-FILE PIPELINE
+# ============================================================
+
+def ingest_file(file_path: str, chunk_size: int = 400, chunk_overlap: int = 40) -> List[Document]:
+    """
+    Load, clean and split one earthquake file.
+
+    Kept at module level so it can be shipped to worker processes.
+    """
+    cleaner = TextCleaner()
+    splitter = TextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+    chunks = []
+    for doc in EarthquakeLoader().load_txt(file_path):
+        chunks.extend(splitter.split_and_clean(doc, cleaner))
+    return chunks
@@ -7,7 +7,7 @@ sys.path.append(PROJECT_ROOT)
 
 from dotenv import load_dotenv
 from src.ingestion import EarthquakeLoader, TextCleaner, TextSplitter
-from src.vectorizer import EmbeddingModel, VectorStoreManager
+from src.vectorizer import VectorStoreManager, get_embedding_model
 from src.retrieval import Retriever
 from src.rag import RAGChain
 
@@ -33,7 +33,7 @@ def load_earthquake_data(file_path: str):
 def build_vector_store(chunks):
     """Build the vector store index."""
     try:
-        embedding_model = EmbeddingModel()
+        embedding_model = get_embedding_model()
         vector_store = VectorStoreManager(embedding_model)
         vector_store.create_index(chunks)
         return vector_store
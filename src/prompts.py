@@ -1,3 +1,4 @@
+from typing import Tuple
 from langchain_core.prompts import ChatPromptTemplate
 
 # Prompt di Sistema RAG (versione italiana)
@@ -39,3 +40,19 @@ def create_rag_prompt_template() -> ChatPromptTemplate:
         ("human", "{question}"),
     ])
 
+
+
+def split_rag_system_prompt() -> Tuple[str, str]:
+    """
+    Restituisce (prefisso, suffisso) del prompt di sistema attorno a {context}.
+
+    Il testo è renderizzato dallo stesso template di create_rag_prompt_template(),
+    quindi escape {{ }} e nuovi segnaposto restano coerenti (un segnaposto in più
+    solleva KeyError). Gli spazi a fine riga del prefisso (a capo Markdown) vengono
+    rimossi: non servono al modello ma verrebbero inviati a ogni richiesta.
+    """
+    sentinel = "\x00CONTEXT\x00"
+    system_message = create_rag_prompt_template().messages[0].format(context=sentinel)
+    prefix, suffix = system_message.content.split(sentinel)
+    prefix = "\n".join(line.rstrip() for line in prefix.split("\n"))
+    return prefix, suffix
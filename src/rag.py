@@ -1,8 +1,13 @@
-from typing import Dict, Any, List
-from langchain_groq import ChatGroq
+import asyncio
+import logging
+from typing import Dict, Any, AsyncIterator, Iterator, List, Optional
 from langchain_core.documents import Document
+from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.prompt_values import ChatPromptValue
 from src.retrieval import Retriever
-from src.prompts import create_rag_prompt_template
+from src.prompts import split_rag_system_prompt
+
+logger = logging.getLogger(__name__)
 
 
 class RAGChain:
@@ -10,55 +15,182 @@ class RAGChain:
 
     def __init__(self, retriever: Retriever, llm_model: str = "llama-3.3-70b-versatile"):
         
+        # Imported here: langchain_groq pulls in the whole HTTP client stack
+        from langchain_groq import ChatGroq
+
         self.retriever = retriever
         self.llm = ChatGroq(model=llm_model, temperature=0)
-        self.prompt_template = create_rag_prompt_template()
+
+        # Upper bound on the context sent to the LLM (prompt length drives latency)
+        self.max_context_chars = 6000
+
+        # Only {context} varies in the system prompt: split it once so each
+        # request is a plain concatenation instead of a template render.
+        self._system_prefix, self._system_suffix = split_rag_system_prompt()
 
     def answer(self, question: str) -> Dict[str, Any]:
         
 
-        # 1. Retrieve relevant documents
-        documents: List[Document] = self.retriever.retrieve(question)
+        # 1. Retrieve relevant documents, within the context budget
+        documents: List[Document] = self.select_context(self.retriever.retrieve(question))
+
+        # 2-3. Build context and prompt
+        prompt_messages = self._build_prompt(question, documents)
+
+        # 4. LLM inference
+        model_response = self.llm.invoke(prompt_messages)
+
+        # 5. Return structured result
+        return self._build_result(question, documents, prompt_messages, model_response)
+
+    async def aanswer(self, question: str) -> Dict[str, Any]:
+        """Async variant of answer(): the LLM call does not block the event loop."""
+
+        # Retrieval is synchronous CPU work: keep it off the event loop
+        documents: List[Document] = await asyncio.to_thread(self.retriever.retrieve, question)
+        documents = self.select_context(documents)
+
+        prompt_messages = self._build_prompt(question, documents)
+
+        model_response = await self.llm.ainvoke(prompt_messages)
+
+        return self._build_result(question, documents, prompt_messages, model_response)
+
+    def stream(self, question: str,
+               documents: Optional[List[Document]] = None) -> Iterator[str]:
+        """
+        Stream the answer text as the LLM produces it.
+
+        Synchronous counterpart of astream(), for callers without their own
+        event loop (e.g. Streamlit's write_stream): the async client's
+        connections stay bound to the loop that opened them, so driving
+        astream() from a fresh loop per call breaks on the next request.
+
+        Args:
+            question (str): user question.
+            documents (List[Document], optional): context already retrieved
+                by the caller (e.g. to display sources); retrieved if omitted.
+        """
+        if documents is None:
+            documents = self.retriever.retrieve(question)
+        documents = self.select_context(documents)
+
+        prompt_messages = self._build_prompt(question, documents)
+
+        for chunk in self.llm.stream(prompt_messages):
+            text = self._content_text(chunk.content)
+            if text:
+                yield text
+
+    async def astream(self, question: str,
+                      documents: Optional[List[Document]] = None) -> AsyncIterator[str]:
+        """
+        Stream the answer text as the LLM produces it.
+
+        Args:
+            question (str): user question.
+            documents (List[Document], optional): context already retrieved
+                by the caller (e.g. to display sources); retrieved if omitted.
+        """
+        if documents is None:
+            documents = await asyncio.to_thread(self.retriever.retrieve, question)
+        documents = self.select_context(documents)
+
+        prompt_messages = self._build_prompt(question, documents)
+
+        async for chunk in self.llm.astream(prompt_messages):
+            text = self._content_text(chunk.content)
+            if text:
+                yield text
+
+    def answer_batch(self, questions: List[str]) -> List[Dict[str, Any]]:
+        """
+        Answer several questions with one retrieval pass and one batched
+        LLM call. Results are returned in the same order as the questions.
+        """
+        documents_per_question = [
+            self.select_context(documents)
+            for documents in self.retriever.retrieve_batch(questions)
+        ]
 
-        # 2. Build context text
+        prompts = [
+            self._build_prompt(question, documents)
+            for question, documents in zip(questions, documents_per_question)
+        ]
+
+        model_responses = self.llm.batch(prompts)
+
+        return [
+            self._build_result(question, documents, prompt_messages, model_response)
+            for question, documents, prompt_messages, model_response
+            in zip(questions, documents_per_question, prompts, model_responses)
+        ]
+
+    def select_context(self, documents: List[Document]) -> List[Document]:
+        """
+        Keep the leading documents whose text fits in max_context_chars.
+
+        Only these documents reach the prompt, so callers should report them
+        (not the full retrieval) as the answer's sources.
+        """
+        selected = []
+        total = 0
+        for doc in documents:
+            # "\n\n" separator between documents
+            total += len(doc.page_content) + 2
+            # The best match is always kept, even if it alone exceeds the budget
+            if selected and total > self.max_context_chars:
+                break
+            selected.append(doc)
+        return selected
+
+    def _build_prompt(self, question: str, documents: List[Document]):
+        """Render the RAG prompt for a question and its retrieved documents."""
         context_text = "\n\n".join(doc.page_content for doc in documents)
 
-        # 3. Construct prompt using template
-        prompt_messages = self.prompt_template.invoke({
-            "context": context_text,
-            "question": question
-        })
+        # Same messages create_rag_prompt_template() would render, minus trailing spaces
+        prompt_messages = ChatPromptValue(messages=[
+            SystemMessage(content=self._system_prefix + context_text + self._system_suffix),
+            HumanMessage(content=question),
+        ])
 
         # --- Logging / Observability ---
-        print("\n--- [OBSERVABILITY] FINAL PROMPT SENT TO MODEL ---")
-        for message in prompt_messages.to_messages():
-            print(f"[{message.type.upper()}]: {message.content}")
-        print("---------------------------------------------------\n")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "[OBSERVABILITY] FINAL PROMPT SENT TO MODEL\n%s",
+                "\n".join(f"[{m.type.upper()}]: {m.content}" for m in prompt_messages.messages),
+            )
 
-        # 4. LLM inference
-        model_response = self.llm.invoke(prompt_messages)
+        return prompt_messages
 
-        # Normalize possible heterogeneous outputs
-        content = model_response.content
-        if isinstance(content, list):
-            # Some models return structured output
-            content = "".join(
-                item.get("text", "")
-                for item in content
-                if isinstance(item, dict) and item.get("type") == "text"
-            )
-        elif not isinstance(content, str):
-            content = str(content)
+    def _build_result(self, question: str, documents: List[Document],
+                      prompt_messages, model_response) -> Dict[str, Any]:
+        """Normalize the model output into the structured answer dict."""
+
+        content = self._content_text(model_response.content)
 
         # --- Logging / Observability ---
-        print("\n--- [OBSERVABILITY] RAW MODEL RESPONSE ---")
-        print(model_response.content)
-        print("---------------------------------------------------\n")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[OBSERVABILITY] RAW MODEL RESPONSE\n%s", model_response.content)
 
-        # 5. Return structured result
         return {
             "answer": content,
             "source_documents": documents,
             "question": question,
             "generated_prompt": prompt_messages
-        }
\ No newline at end of file
+        }
+
+
+    @staticmethod
+    def _content_text(content) -> str:
+        """Normalize possible heterogeneous model outputs to plain text."""
+        if isinstance(content, list):
+            # Some models return structured output
+            return "".join(
+                item.get("text", "")
+                for item in content
+                if isinstance(item, dict) and item.get("type") == "text"
+            )
+        if not isinstance(content, str):
+            return str(content)
+        return content
@@ -1,8 +1,38 @@
+import os
+import threading
+from collections import OrderedDict
 from typing import List, Optional
+import numpy as np
 from langchain_core.documents import Document
 from src.vectorizer import VectorStoreManager
 
+try:
+    import numba
+except ImportError:  # numba is optional: the plain loop runs in CPython
+    numba = None
+
+
+def _scores_to_sims(scores: np.ndarray, squared_l2: bool) -> np.ndarray:
+    """
+    Convert FAISS scores of L2-normalized vectors to cosine similarities.
+
+    Inner-product scores already are; squared L2 distances (indexes built
+    before the switch to inner product) map as cos = 1 - d / 2.
+    """
+    sims = np.empty_like(scores)
+    for i in range(scores.shape[0]):
+        sims[i] = 1.0 - scores[i] / 2.0 if squared_l2 else scores[i]
+    return sims
+
+
+if numba is not None:
+    _scores_to_sims = numba.njit(cache=True, fastmath=True)(_scores_to_sims)
+
+
 class Retriever:
+    # Most recent query embeddings kept in memory
+    QUERY_CACHE_SIZE = 1024
+
     def __init__(self, vector_store_manager: VectorStoreManager):
         """
         Initialize the Retriever.
@@ -11,6 +41,9 @@ class Retriever:
             vector_store_manager (VectorStoreManager): The managed vector store.
         """
         self.vector_store_manager = vector_store_manager
+        self._query_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        # The Retriever is shared across Streamlit sessions (threads)
+        self._query_cache_lock = threading.Lock()
 
     def retrieve(self, query: str, k: int = 8) -> List[Document]:
         """
@@ -27,16 +60,139 @@ class Retriever:
             # Decide on behavior for empty query. Returning empty list is safest.
             return []
             
-        retriever = self.vector_store_manager.get_retriever(k=k)
-        return retriever.invoke(query)
+        if k <= 0:
+            raise ValueError("k must be a positive integer.")
+
+        if self.vector_store_manager.vector_store is None:
+            raise ValueError("Vector store not initialized.")
+
+        # Same (cached) query vector and search parameters as retrieve_with_logs:
+        # the model runs once per query
+        query_vector = np.asarray(self._embed_query(query), dtype=np.float32)[None, :]
+        (results,), _ = self._search(query_vector, k, self._search_params())
+        return results
+
+    def retrieve_batch(self, queries: List[str], k: int = 8) -> List[List[Document]]:
+        """
+        Retrieve relevant documents for several queries at once.
+
+        All queries are embedded in one call and searched with a single
+        FAISS query matrix instead of one search per query.
+
+        Args:
+            queries (List[str]): The search queries.
+            k (int): Number of documents to retrieve per query.
+
+        Returns:
+            List[List[Document]]: Retrieved documents, one list per query.
+        """
+        results, _ = self._search_batch(queries, k)
+        return results
+
+    def retrieve_batch_with_logs(self, queries: List[str], k: int = 8, ef_search: Optional[int] = None,
+                                 nprobe: Optional[int] = None) -> List[dict]:
+        """
+        Batched retrieve_with_logs(): one embedding call and one FAISS
+        search for all queries.
+
+        Args:
+            queries (List[str]): The search queries.
+            k (int): Number of documents per query.
+            ef_search (int, optional): HNSW search beam for these queries.
+                Defaults to the HNSW_EF_SEARCH env var, else the build-time value.
+            nprobe (int, optional): IVF lists scanned for these queries.
+                Defaults to the IVF_NPROBE env var, else the build-time value.
+
+        Returns:
+            List[dict]: One {'results', 'logs'} dict per query, in order.
+        """
+        if not any(q and q.strip() for q in queries):
+            return [{"results": [], "logs": []} for _ in queries]
+
+        results, scores = self._search_batch(queries, k, ef_search, nprobe)
+        # See retrieve_with_logs for the str comparison
+        squared_l2 = self.vector_store_manager.vector_store.distance_strategy == "EUCLIDEAN_DISTANCE"
 
-    def retrieve_with_logs(self, query: str, k: int = 8):
+        return [
+            {"results": docs, "logs": self._build_logs(docs, _scores_to_sims(query_scores, squared_l2))}
+            for docs, query_scores in zip(results, scores)
+        ]
+
+    def _search_batch(self, queries: List[str], k: int, ef_search: Optional[int] = None,
+                      nprobe: Optional[int] = None):
+        """Embed and search all queries together; returns (documents, scores) per query."""
+        results: List[List[Document]] = [[] for _ in queries]
+        scores: List[np.ndarray] = [np.empty(0, dtype=np.float32) for _ in queries]
+
+        # Empty queries keep an empty result, as in retrieve()
+        active = [i for i, q in enumerate(queries) if q and q.strip()]
+        if not active:
+            return results, scores
+
+        manager = self.vector_store_manager
+        if manager.vector_store is None:
+            raise ValueError("Vector store not initialized.")
+
+        Q = manager.embedding_model.encode([queries[i] for i in active])
+        params = self._search_params(ef_search, nprobe)
+        for query_idx, docs, query_scores in zip(active, *self._search(Q, k, params)):
+            results[query_idx] = docs
+            scores[query_idx] = query_scores
+
+        return results, scores
+
+    def _search_params(self, ef_search: Optional[int] = None, nprobe: Optional[int] = None):
+        """
+        FAISS search parameters for one call: explicit values, then the
+        HNSW_EF_SEARCH / IVF_NPROBE env vars, else None (build-time values).
+
+        They are passed with the search, so the shared index (and other
+        sessions) keep their own settings.
+        """
+        if ef_search is None and os.getenv("HNSW_EF_SEARCH"):
+            ef_search = int(os.environ["HNSW_EF_SEARCH"])
+        if nprobe is None and os.getenv("IVF_NPROBE"):
+            nprobe = int(os.environ["IVF_NPROBE"])
+        return self.vector_store_manager.search_params(ef_search=ef_search, nprobe=nprobe)
+
+    def _search(self, Q: np.ndarray, k: int, params=None):
+        """Search a matrix of query vectors; returns (documents, scores) per row."""
+        manager = self.vector_store_manager
+        Q = np.ascontiguousarray(Q, dtype=np.float32)
+        nq = Q.shape[0]
+
+        # Output buffers are sized (nq, k) by us, never by the vector dimension
+        D, I = manager.index.search(
+            Q, k,
+            params=params,
+            D=np.empty((nq, k), dtype=np.float32),
+            I=np.empty((nq, k), dtype=np.int64),
+        )
+        assert D.shape == I.shape == (nq, k)
+
+        docstore = manager.vector_store.docstore
+        id_map = manager.index_to_docstore_id
+        results, scores = [], []
+        for dists, row in zip(D, I):
+            # FAISS pads with -1 when fewer than k vectors are found
+            found = row != -1
+            results.append([docstore.search(id_map[int(j)]) for j in row[found]])
+            scores.append(dists[found])
+
+        return results, scores
+
+    def retrieve_with_logs(self, query: str, k: int = 8, ef_search: Optional[int] = None,
+                           nprobe: Optional[int] = None):
         """
         Retrieve documents and return them with detailed logging info.
         
         Args:
             query (str): The search query.
             k (int): Number of documents.
+            ef_search (int, optional): HNSW search beam for this query.
+                Defaults to the HNSW_EF_SEARCH env var, else the build-time value.
+            nprobe (int, optional): IVF lists scanned for this query.
+                Defaults to the IVF_NPROBE env var, else the build-time value.
             
         Returns:
             dict: Contains 'results' (documents) and 'logs' (list of dicts).
@@ -44,27 +200,55 @@ class Retriever:
         if not query or not query.strip():
             return {"results": [], "logs": []}
             
-        # We need to access the vector store directly to get scores if possible,
-        # but standard retriever.invoke() returns just docs.
-        # To get scores, we might need similarity_search_with_score on the store.
-        
+        # The raw FAISS index is searched directly: it returns scores, and
+        # takes per-call search parameters that LangChain's wrapper does not.
+
         vector_store = self.vector_store_manager.vector_store
         if vector_store is None:
              raise ValueError("Vector store not initialized.")
              
         # Perform search with scores
-        docs_and_scores = vector_store.similarity_search_with_score(query, k=k)
-        
-        results = []
-        logs = []
-        
-        for i, (doc, score) in enumerate(docs_and_scores):
-            results.append(doc)
-            logs.append({
-                "rank": i + 1,
+        query_vector = np.asarray(self._embed_query(query), dtype=np.float32)[None, :]
+        (results,), (scores,) = self._search(query_vector, k, self._search_params(ef_search, nprobe))
+
+        # DistanceStrategy is a str enum; comparing the value avoids importing
+        # langchain_community at module load
+        sims = _scores_to_sims(scores, vector_store.distance_strategy == "EUCLIDEAN_DISTANCE")
+
+        return {"results": results, "logs": self._build_logs(results, sims)}
+
+    @staticmethod
+    def _build_logs(documents: List[Document], sims: np.ndarray) -> List[dict]:
+        """One log entry per retrieved document, in rank order."""
+        # FAISS already returns the top k sorted by score: no re-ranking here
+        return [
+            {
+                "rank": rank,
                 "content_snippet": doc.page_content[:100] + "...",
                 "source": doc.metadata.get("source", "unknown"),
-                "score": float(score) # Lower is better for L2, Higher for Cosine usually (FAISS default depends)
-            })
-            
-        return {"results": results, "logs": logs}
+                "score": sim, # Cosine similarity: higher is better
+            }
+            # tolist() converts all scores to Python floats in one C call
+            for rank, (doc, sim) in enumerate(zip(documents, sims.tolist()), 1)
+        ]
+
+    def _embed_query(self, query: str) -> List[float]:
+        """Embed a query, reusing the vector of a previously seen identical query."""
+        # Whitespace runs do not change the tokenization
+        key = " ".join(query.split())
+
+        with self._query_cache_lock:
+            vector = self._query_cache.get(key)
+            if vector is not None:
+                self._query_cache.move_to_end(key)
+                return vector
+
+        # The model runs outside the lock: a miss does not block other sessions
+        vector = self.vector_store_manager.embedding_model.embed_query(key)
+
+        with self._query_cache_lock:
+            self._query_cache[key] = vector
+            self._query_cache.move_to_end(key)
+            if len(self._query_cache) > self.QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+        return vector
@@ -1,7 +1,358 @@
-from typing import List, Optional
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.vectorstores import FAISS
+import os
+import uuid
+from hashlib import blake2b
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+import numpy as np
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+# FAISS, torch and sentence-transformers are imported where they are used:
+# they take seconds to load and many code paths never need them.
+if TYPE_CHECKING:
+    import faiss
+    from langchain_community.vectorstores import FAISS
+
+
+def _default_device() -> str:
+    """Return "cuda" when a GPU is visible to torch, "cpu" otherwise."""
+    try:
+        import torch
+    except ImportError:
+        return "cpu"
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def _default_precision(device: str) -> str:
+    """bf16 on GPUs with native support (Ampere+), fp16 on older ones, fp32 on CPU."""
+    if device != "cuda":
+        return "fp32"
+    import torch
+    # is_bf16_supported() also counts emulated bf16 (T4, V100), which is slower than fp16
+    major, _ = torch.cuda.get_device_capability()
+    return "bf16" if major >= 8 else "fp16"
+
+
+def _resolve_precision(device: str, precision: Optional[str] = None) -> str:
+    """Explicit precision, then EMBEDDING_PRECISION, then the device default."""
+    precision = precision or os.getenv("EMBEDDING_PRECISION") or _default_precision(device)
+    if precision not in ("fp32", "fp16", "bf16", "int8"):
+        raise ValueError("precision must be one of 'fp32', 'fp16', 'bf16', 'int8'.")
+    return precision
+
+
+# ============================================================
+# Half-precision Embeddings
+# ============================================================
+
+class HalfPrecisionEmbeddings(Embeddings):
+    """
+    Transformer encoder loaded in fp16/bf16 with mean pooling.
+    Pooled vectors are upcast to fp32 before L2 normalization.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        device: str = "cuda",
+        dtype: str = "fp16",
+        batch_size: int = 256,
+        max_length: int = 256,
+    ):
+        """
+        Load tokenizer and model weights in reduced precision.
+
+        Args:
+            model_name (str): HuggingFace model id or local path.
+            device (str): torch device the model runs on.
+            dtype (str): "fp16" or "bf16".
+            batch_size (int): texts per forward pass.
+            max_length (int): token limit per text.
+        """
+        import torch
+        from transformers import AutoModel, AutoTokenizer
+
+        if dtype not in ("fp16", "bf16"):
+            raise ValueError("dtype must be 'fp16' or 'bf16'.")
+
+        self.device = device
+        self.dtype = torch.float16 if dtype == "fp16" else torch.bfloat16
+        self.batch_size = batch_size
+        self.max_length = max_length
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModel.from_pretrained(
+            model_name, dtype=self.dtype
+        ).to(device).eval()
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Embed texts into a normalized float32 matrix."""
+        import torch
+        import torch.nn.functional as F
+
+        if not texts:
+            return np.empty((0, self.model.config.hidden_size), dtype=np.float32)
+
+        # Tokenize everything in one call, then slice into sub-batches
+        encoded = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors="pt",
+        )
+
+        outputs = []
+
+        # Weights are already stored in half precision: no autocast needed
+        with torch.inference_mode():
+            for start in range(0, len(texts), self.batch_size):
+                batch = {k: v[start:start + self.batch_size] for k, v in encoded.items()}
+
+                # Drop the padding columns this sub-batch does not need
+                width = int(batch["attention_mask"].sum(dim=1).max())
+                batch = {k: v[:, :width].to(self.device) for k, v in batch.items()}
+
+                hidden = self.model(**batch).last_hidden_state
+
+                # Mean pooling over real tokens, reduced in fp32
+                mask = batch["attention_mask"].unsqueeze(-1).float()
+                pooled = (hidden.float() * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+
+                outputs.append(F.normalize(pooled, dim=-1).cpu())
+
+        return torch.cat(outputs).numpy()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.encode(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.encode([text])[0].tolist()
+
+
+# ============================================================
+# ONNX Runtime INT8 Embeddings
+# ============================================================
+
+class OnnxEmbeddings(Embeddings):
+    """
+    Dynamically quantized (INT8) ONNX export of the model, run through
+    ONNX Runtime on CPU. The export happens once and is cached on disk.
+    """
+
+    CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "rag-ai")
+    QUANTIZED_FILE = "model_quantized.onnx"
+
+    def __init__(
+        self,
+        model_name: str,
+        batch_size: int = 256,
+        max_length: int = 256,
+        cache_dir: Optional[str] = None,
+    ):
+        """
+        Load (exporting first if needed) the quantized model.
+
+        Args:
+            model_name (str): HuggingFace model id or local path.
+            batch_size (int): texts per session.run call.
+            max_length (int): token limit per text.
+            cache_dir (str, optional): where exported models are kept.
+        """
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.batch_size = batch_size
+        self.max_length = max_length
+
+        model_dir = self.export(model_name, cache_dir)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+
+        sess_options = ort.SessionOptions()
+        sess_options.intra_op_num_threads = os.cpu_count() or 1
+        sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, self.QUANTIZED_FILE),
+            sess_options=sess_options,
+            providers=["CPUExecutionProvider"],
+        )
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+    @classmethod
+    def export(cls, model_name: str, cache_dir: Optional[str] = None) -> str:
+        """
+        Export the model to ONNX and quantize it to INT8 (one-time step).
+
+        Returns:
+            str: directory holding the quantized model and its tokenizer.
+        """
+        model_dir = os.path.join(cache_dir or cls.CACHE_DIR, model_name.replace("/", "__"))
+        if os.path.exists(os.path.join(model_dir, cls.QUANTIZED_FILE)):
+            return model_dir
+
+        try:
+            from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+            from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        except ImportError as e:
+            raise ImportError(
+                "ONNX export requires optimum: pip install optimum[onnxruntime]"
+            ) from e
+        from transformers import AutoTokenizer
+
+        model = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True)
+        model.save_pretrained(model_dir)
+        AutoTokenizer.from_pretrained(model_name).save_pretrained(model_dir)
+
+        quantizer = ORTQuantizer.from_pretrained(model)
+        quantizer.quantize(
+            save_dir=model_dir,
+            quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False),
+        )
+        return model_dir
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Embed texts into a normalized float32 matrix."""
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        encoded = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors="np",
+        )
+        encoded = {k: v for k, v in encoded.items() if k in self._input_names}
+
+        outputs = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = {k: v[start:start + self.batch_size] for k, v in encoded.items()}
+
+            # Drop the padding columns this sub-batch does not need
+            width = int(batch["attention_mask"].sum(axis=1).max())
+            batch = {k: v[:, :width] for k, v in batch.items()}
+
+            hidden = self.session.run(None, batch)[0]
+
+            # Mean pooling over real tokens
+            mask = batch["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            outputs.append(pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None))
+
+        return np.concatenate(outputs).astype(np.float32)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.encode(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.encode([text])[0].tolist()
+
+
+# ============================================================
+# Remote Embeddings (embedding server)
+# ============================================================
+
+class RemoteEmbeddings(Embeddings):
+    """
+    Client for an OpenAI-compatible embeddings endpoint
+    (text-embeddings-inference, infinity, ...). Texts are sent in
+    concurrent sub-batches; the server batches them dynamically.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        model_name: str,
+        batch_size: int = 64,
+        max_concurrency: int = 8,
+        timeout: float = 60.0,
+    ):
+        """
+        Args:
+            endpoint (str): full URL of the embeddings route,
+                e.g. http://localhost:8080/v1/embeddings.
+            model_name (str): model name sent with each request.
+            batch_size (int): texts per HTTP request.
+            max_concurrency (int): requests in flight at once.
+            timeout (float): per-request timeout in seconds.
+        """
+        self.endpoint = endpoint
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+
+    async def aencode(self, texts: List[str]) -> np.ndarray:
+        """Embed texts into a normalized float32 matrix."""
+        import asyncio
+        import httpx
+
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def post(client: "httpx.AsyncClient", batch: List[str]) -> List[List[float]]:
+            async with semaphore:
+                response = await client.post(
+                    self.endpoint, json={"model": self.model_name, "input": batch}
+                )
+            return self._parse(response)
+
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            batches = await asyncio.gather(*(post(client, batch) for batch in self._batches(texts)))
+
+        return self._normalize(batches)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts into a normalized float32 matrix.
+
+        Uses a thread pool rather than an event loop, so it also works when
+        the caller already runs one (Jupyter, async servers).
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        import httpx
+
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        def post(batch: List[str]) -> List[List[float]]:
+            return self._parse(client.post(self.endpoint, json={"model": self.model_name, "input": batch}))
+
+        with httpx.Client(timeout=self.timeout) as client, \
+                ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            batches = list(executor.map(post, self._batches(texts)))
+
+        return self._normalize(batches)
+
+    def _batches(self, texts: List[str]) -> List[List[str]]:
+        return [texts[start:start + self.batch_size] for start in range(0, len(texts), self.batch_size)]
+
+    @staticmethod
+    def _parse(response) -> List[List[float]]:
+        """Embeddings of one response, in input order."""
+        response.raise_for_status()
+        data = sorted(response.json()["data"], key=lambda item: item["index"])
+        return [item["embedding"] for item in data]
+
+    @staticmethod
+    def _normalize(batches: List[List[List[float]]]) -> np.ndarray:
+        embs = np.asarray([vec for batch in batches for vec in batch], dtype=np.float32)
+        # Servers do not all normalize: do it here so the IP metric stays cosine
+        return embs / np.clip(np.linalg.norm(embs, axis=1, keepdims=True), 1e-12, None)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.encode(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.encode([text])[0].tolist()
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return (await self.aencode(texts)).tolist()
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aencode([text]))[0].tolist()
 
 
 # ============================================================
@@ -15,17 +366,59 @@ class EmbeddingModel:
     """
 
     DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+    BATCH_SIZE = 256
 
-    def __init__(self, model_name: Optional[str] = None):
+    def __init__(self, model_name: Optional[str] = None, precision: Optional[str] = None):
         """
         Initialize the embedding model.
 
         Args:
             model_name (str, optional): HuggingFace sentence-transformer model.
+            precision (str, optional): "fp32", "fp16", "bf16" or "int8"
+                (ONNX Runtime, CPU). Defaults to EMBEDDING_PRECISION, then
+                bf16 (or fp16) on GPU and fp32 on CPU. Ignored when the
+                EMBED_ENDPOINT env var points to an embedding server.
         """
         model_name = model_name or self.DEFAULT_MODEL
+        self.model_name = model_name
+        self.device = _default_device()
+
+        # An external embedding server, when configured, replaces the local model
+        endpoint = os.getenv("EMBED_ENDPOINT")
+
+        # Precision only applies to the local model
+        precision = "remote" if endpoint else _resolve_precision(self.device, precision)
+        self.precision = precision
 
-        self.embeddings = HuggingFaceEmbeddings(model_name=model_name)
+        if endpoint:
+            self.embeddings = RemoteEmbeddings(endpoint, model_name)
+            self.st_model = None
+        elif precision == "fp32":
+            from langchain_community.embeddings import HuggingFaceEmbeddings
+
+            # Vectors are L2-normalized on both the index and the query side,
+            # so distances stay comparable whichever path produced them.
+            # LangChain's embed_documents (add_documents) batches like encode().
+            self.embeddings = HuggingFaceEmbeddings(
+                model_name=model_name,
+                model_kwargs={"device": self.device},
+                encode_kwargs={"batch_size": self.BATCH_SIZE, "normalize_embeddings": True},
+            )
+
+            # Underlying SentenceTransformer, shared with LangChain so the
+            # weights are only loaded once.
+            self.st_model = self.embeddings.client
+        elif precision == "int8":
+            self.embeddings = OnnxEmbeddings(model_name, batch_size=self.BATCH_SIZE)
+            self.st_model = None
+        else:
+            self.embeddings = HalfPrecisionEmbeddings(
+                model_name,
+                device=self.device,
+                dtype=precision,
+                batch_size=self.BATCH_SIZE,
+            )
+            self.st_model = None
 
     def embed_query(self, text: str) -> List[float]:
         """Generate embeddings for a single query string."""
@@ -41,6 +434,70 @@ class EmbeddingModel:
 
         return self.embeddings.embed_documents(documents)
 
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Embed a batch of texts into a normalized float32 matrix."""
+        if self.st_model is None:
+            return self.embeddings.encode(texts)
+
+        return self.st_model.encode(
+            texts,
+            batch_size=self.BATCH_SIZE,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )
+
+
+_EMB_CACHE: Dict[Tuple[str, str, str], EmbeddingModel] = {}
+
+
+def get_embedding_model(model_name: Optional[str] = None, precision: Optional[str] = None) -> EmbeddingModel:
+    """
+    Return the process-wide EmbeddingModel for a configuration, loading it on first use.
+
+    Sharing one instance per (model_name, device, precision) avoids reloading
+    the model weights for every VectorStoreManager (scripts, reindexing,
+    Streamlit cache invalidation).
+
+    Args:
+        model_name (str, optional): Same as EmbeddingModel.
+        precision (str, optional): Same as EmbeddingModel.
+    """
+    device = _default_device()
+    key = (
+        model_name or EmbeddingModel.DEFAULT_MODEL,
+        device,
+        "remote" if os.getenv("EMBED_ENDPOINT") else _resolve_precision(device, precision),
+    )
+
+    model = _EMB_CACHE.get(key)
+    if model is None:
+        model = EmbeddingModel(model_name, precision)
+        if model.precision != "remote":
+            _configure_torch(model.device)
+            # Pay kernel selection / MKL JIT costs here rather than on the first user query
+            model.embed_query("warmup")
+        _EMB_CACHE[key] = model
+    return model
+
+
+def clear_embedding_cache() -> None:
+    """Drop the models shared by get_embedding_model() so the next call reloads them."""
+    _EMB_CACHE.clear()
+
+
+def _configure_torch(device: str) -> None:
+    """Tune torch's global runtime for embedding inference on the given device."""
+    try:
+        import torch
+    except ImportError:
+        return
+    if device == "cuda":
+        torch.backends.cudnn.benchmark = True
+    else:
+        # Leave one core to the UI / request handling thread
+        torch.set_num_threads(max(1, (os.cpu_count() or 1) - 1))
+
 
 # ============================================================
 # Vector Store Manager
@@ -49,20 +506,44 @@ class EmbeddingModel:
 class VectorStoreManager:
     """
     Handles creation, management, and retrieval for a FAISS-based vector store.
+
+    Corpora up to IVF_PQ_MIN_DOCS are indexed with HNSW (graph search,
+    full vectors); larger ones with IVF-PQ (compressed vectors, lower
+    memory bandwidth per query), whose candidates are re-ranked on the
+    full vectors.
+    Embeddings are L2-normalized, so indexes use the inner-product metric
+    and scores are cosine similarities (higher is better).
     """
 
-    def __init__(self, embedding_model: EmbeddingModel):
+    HNSW_M = 32
+    HNSW_EF_CONSTRUCTION = 100
+    HNSW_EF_SEARCH = 64
+
+    IVF_PQ_MIN_DOCS = 10_000
+    IVF_PQ_M = 48           # sub-quantizers (bytes per vector at 8 bits): 8 dims each for 384-d MiniLM
+    IVF_PQ_NBITS = 8
+    IVF_REFINE_K_FACTOR = 8 # PQ candidates per result re-ranked with exact inner products
+    IVF_TRAIN_MIN = 10_000  # training sample: max(10 * nlist, IVF_TRAIN_MIN) vectors
+    IVF_NPROBE = 16
+
+    def __init__(self, embedding_model: Optional[EmbeddingModel] = None):
         """
         Initialize the manager.
 
         Args:
-            embedding_model (EmbeddingModel): initialized embedding wrapper.
+            embedding_model (EmbeddingModel, optional): initialized embedding
+                wrapper. Defaults to the shared get_embedding_model() instance.
         """
+        if embedding_model is None:
+            embedding_model = get_embedding_model()
+
         if not isinstance(embedding_model, EmbeddingModel):
             raise TypeError("embedding_model must be an instance of EmbeddingModel.")
 
         self.embedding_model = embedding_model
-        self.vector_store: Optional[FAISS] = None
+        self.vector_store: Optional["FAISS"] = None
+        # Set by load(mmap=True): the index then views the file and cannot grow
+        self._read_only = False
 
     def create_index(self, documents: List[Document]) -> None:
         """
@@ -74,10 +555,173 @@ class VectorStoreManager:
         if not documents:
             raise ValueError("Cannot create vector store: document list is empty.")
 
-        self.vector_store = FAISS.from_documents(
-            documents,
-            self.embedding_model.embeddings
+        from langchain_community.docstore.in_memory import InMemoryDocstore
+        from langchain_community.vectorstores import FAISS
+        from langchain_community.vectorstores.utils import DistanceStrategy
+
+        # Catalogs re-report the same event from several sources: chunks with
+        # identical text are embedded and indexed once.
+        by_hash = {}
+        for doc in documents:
+            digest = blake2b(doc.page_content.encode("utf-8"), digest_size=16).digest()
+            by_hash.setdefault(digest, []).append(doc)
+
+        texts = []
+        metadatas = []
+        for group in by_hash.values():
+            texts.append(group[0].page_content)
+            metadata = dict(group[0].metadata)
+            if len(group) > 1:
+                # The representative remembers every event it stands for
+                metadata["event_ids"] = [d.metadata.get("event_id") for d in group]
+            metadatas.append(metadata)
+
+        # One encode() call over the whole corpus: large batches amortize
+        # tokenizer setup and kernel launches across thousands of short chunks.
+        embs = np.ascontiguousarray(self.embedding_model.encode(texts), dtype=np.float32)
+
+        index = self._build_index(embs)
+
+        ids = [str(uuid.uuid4()) for _ in texts]
+        docstore = InMemoryDocstore({
+            doc_id: Document(page_content=text, metadata=metadata)
+            for doc_id, text, metadata in zip(ids, texts, metadatas)
+        })
+
+        self.vector_store = FAISS(
+            embedding_function=self.embedding_model.embeddings,
+            index=index,
+            docstore=docstore,
+            index_to_docstore_id=dict(enumerate(ids)),
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT,
         )
+        self._read_only = False
+
+    def _build_index(self, embs: np.ndarray) -> "faiss.Index":
+        """Build the index with every core, then restore FAISS's thread count."""
+        import faiss
+
+        # An explicit OMP_NUM_THREADS is the user's choice: leave it alone
+        if os.getenv("OMP_NUM_THREADS"):
+            return self._fill_index(embs)
+
+        # Training and HNSW insertion are OpenMP-parallel: use every core for
+        # the build only; searches keep the process-wide setting
+        previous = faiss.omp_get_max_threads()
+        faiss.omp_set_num_threads(os.cpu_count() or 1)
+        try:
+            return self._fill_index(embs)
+        finally:
+            faiss.omp_set_num_threads(previous)
+
+    def _fill_index(self, embs: np.ndarray) -> "faiss.Index":
+        """Pick, train and fill a FAISS index sized for the corpus."""
+        import faiss
+
+        n, dim = embs.shape
+
+        if n > self.IVF_PQ_MIN_DOCS and dim % self.IVF_PQ_M == 0:
+            nlist = int(4 * np.sqrt(n))
+            quantizer = faiss.IndexFlatIP(dim)
+            ivf = faiss.IndexIVFPQ(
+                quantizer, dim, nlist, self.IVF_PQ_M, self.IVF_PQ_NBITS,
+                faiss.METRIC_INNER_PRODUCT,
+            )
+            ivf.nprobe = self.IVF_NPROBE
+            # PQ distances alone lose most true neighbours: the top
+            # k * k_factor PQ candidates are re-scored on the full vectors
+            index = faiss.IndexRefineFlat(ivf)
+            index.k_factor = self.IVF_REFINE_K_FACTOR
+            # Train on a random sample: k-means cost grows with the sample, not the corpus
+            n_train = min(n, max(10 * nlist, self.IVF_TRAIN_MIN))
+            sample = np.random.default_rng(0).choice(n, size=n_train, replace=False)
+            index.train(embs[np.sort(sample)])
+        else:
+            index = faiss.IndexHNSWFlat(dim, self.HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = self.HNSW_EF_CONSTRUCTION
+            index.hnsw.efSearch = self.HNSW_EF_SEARCH
+
+        # One add() over the contiguous matrix (see create_index), so FAISS
+        # parallelizes internally
+        index.add(embs)
+        return index
+
+    @property
+    def index(self) -> "faiss.Index":
+        """Raw FAISS index behind the vector store."""
+        if self.vector_store is None:
+            raise ValueError("Vector store not initialized. Call create_index() first.")
+        return self.vector_store.index
+
+    @property
+    def index_to_docstore_id(self) -> dict:
+        """Mapping from FAISS row ids to docstore ids."""
+        if self.vector_store is None:
+            raise ValueError("Vector store not initialized. Call create_index() first.")
+        return self.vector_store.index_to_docstore_id
+
+    def search_params(self, ef_search: Optional[int] = None,
+                      nprobe: Optional[int] = None) -> Optional["faiss.SearchParameters"]:
+        """
+        Per-call search parameters for the current index type.
+
+        Passed to index.search(..., params=...), they apply to that call
+        only: the shared index keeps its build-time efSearch / nprobe.
+
+        Args:
+            ef_search (int, optional): HNSW search beam (HNSW indexes).
+            nprobe (int, optional): IVF lists scanned (IVF indexes).
+
+        Returns:
+            The parameters, or None when nothing applies to this index.
+        """
+        import faiss
+
+        index = faiss.downcast_index(self.index)
+        if ef_search is not None and isinstance(index, faiss.IndexHNSW):
+            return faiss.SearchParametersHNSW(efSearch=ef_search)
+        if nprobe is not None:
+            try:
+                faiss.extract_index_ivf(index)
+            except RuntimeError:
+                return None
+            if isinstance(index, faiss.IndexRefine):
+                # Refine parameters replace the index's own: keep its k_factor
+                return faiss.IndexRefineSearchParameters(
+                    k_factor=index.k_factor,
+                    base_index_params=faiss.SearchParametersIVF(nprobe=nprobe),
+                )
+            return faiss.SearchParametersIVF(nprobe=nprobe)
+        return None
+
+    def set_nprobe(self, nprobe: int) -> None:
+        """
+        Set how many IVF lists are scanned by all subsequent queries.
+
+        Larger values raise recall at the cost of latency. No-op for
+        non-IVF indexes. Changes the shared index: use search_params()
+        for a single query.
+        """
+        import faiss
+
+        try:
+            faiss.extract_index_ivf(self.index).nprobe = nprobe
+        except RuntimeError:
+            pass
+
+    def set_ef_search(self, ef_search: int) -> None:
+        """
+        Set the HNSW search beam for all subsequent queries.
+
+        Larger values raise recall at the cost of latency. No-op for
+        non-HNSW indexes. Changes the shared index: use search_params()
+        for a single query.
+        """
+        import faiss
+
+        index = faiss.downcast_index(self.index)
+        if isinstance(index, faiss.IndexHNSW):
+            index.hnsw.efSearch = ef_search
 
     def add_documents(self, documents: List[Document]) -> None:
         """
@@ -92,8 +736,99 @@ class VectorStoreManager:
         if not documents:
             raise ValueError("Document list cannot be empty.")
 
+        if self._read_only:
+            # FAISS aborts the process when a memory-mapped index is resized
+            raise ValueError("Index was loaded with mmap=True and is read-only; load it with mmap=False to add documents.")
+
         self.vector_store.add_documents(documents)
 
+    def save(self, path: str) -> None:
+        """
+        Persist the FAISS index and docstore to a directory.
+
+        The files are written to a temporary sibling directory that then
+        replaces path, so an index memory-mapped from path by load() (in
+        this or another process) keeps reading its old, unchanged files.
+
+        Args:
+            path (str): target directory (created if missing).
+        """
+        if self.vector_store is None:
+            raise ValueError("Vector store not initialized. Call create_index() first.")
+
+        import shutil
+        import tempfile
+
+        path = os.path.abspath(path)
+        parent = os.path.dirname(path)
+        os.makedirs(parent, exist_ok=True)
+
+        tmp_dir = tempfile.mkdtemp(prefix=f".{os.path.basename(path)}.", dir=parent)
+        try:
+            self.vector_store.save_local(tmp_dir)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        # Renames only: files still mapped by a previous load() are never rewritten
+        old_dir = None
+        if os.path.exists(path):
+            old_dir = tmp_dir + ".old"
+            os.replace(path, old_dir)
+        os.replace(tmp_dir, path)
+        if old_dir is not None:
+            shutil.rmtree(old_dir, ignore_errors=True)
+
+    def load(self, path: str, mmap: bool = True) -> None:
+        """
+        Load an index previously written by save().
+
+        Args:
+            path (str): directory holding the saved index.
+            mmap (bool): memory-map the stored vectors read-only instead of
+                reading them into RAM: the full vectors of HNSW and of the
+                IVF-PQ re-ranking step, the bulk of the file. Their pages are
+                loaded on demand and shared between processes; the graph and
+                the IVF lists are still read into RAM. The loaded index is
+                read-only (add_documents raises).
+        """
+        from langchain_community.vectorstores import FAISS
+        from langchain_community.vectorstores.utils import DistanceStrategy
+
+        if not mmap:
+            self.vector_store = FAISS.load_local(
+                path,
+                self.embedding_model.embeddings,
+                allow_dangerous_deserialization=True,
+                distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT,
+            )
+            self._read_only = False
+            return
+
+        import pickle
+        import faiss
+
+        # Same files FAISS.save_local writes (and load_local reads).
+        # IO_FLAG_MMAP_IFC (faiss >= 1.11) maps flat-code storage
+        # (IndexFlatCodes); older releases only have the IVF-only
+        # IO_FLAG_MMAP, which leaves HNSW vectors fully in RAM.
+        mmap_flag = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+        index = faiss.read_index(
+            os.path.join(path, "index.faiss"),
+            mmap_flag | faiss.IO_FLAG_READ_ONLY,
+        )
+        with open(os.path.join(path, "index.pkl"), "rb") as f:
+            docstore, index_to_docstore_id = pickle.load(f)
+
+        self.vector_store = FAISS(
+            embedding_function=self.embedding_model.embeddings,
+            index=index,
+            docstore=docstore,
+            index_to_docstore_id=index_to_docstore_id,
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT,
+        )
+        self._read_only = True
+
     def get_retriever(self, k: int = 4):
         """
         Retrieve a LangChain retriever interface.
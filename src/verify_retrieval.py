@@ -1,8 +1,11 @@
 import os
 import sys
 import csv
+import hashlib
 import html
-from typing import List
+import io
+import multiprocessing
+from typing import Iterable, Iterator, List
 from dotenv import load_dotenv
 
 # Extend import path
@@ -11,7 +14,7 @@ sys.path.append(PROJECT_ROOT)
 
 from langchain.schema import Document
 from src.ingestion import TextCleaner, TextSplitter
-from src.vectorizer import EmbeddingModel, VectorStoreManager
+from src.vectorizer import VectorStoreManager, get_embedding_model
 from src.retrieval import Retriever
 
 
@@ -19,9 +22,10 @@ from src.retrieval import Retriever
 # LOAD EARTHQUAKE CSV AS DOCUMENTS
 # ============================================================
 
-def load_earthquake_file_as_docs(file_path: str) -> List[Document]:
+def load_earthquake_file_as_docs(file_path: str) -> Iterator[Document]:
     """
-    Load a CSV containing earthquake events and convert each row into a Document.
+    Load a CSV containing earthquake events and yield each row as a Document,
+    so the catalog is never held in memory as a whole.
     Handles:
     - multiple fallback encodings
     - empty or malformed fields
@@ -50,16 +54,12 @@ def load_earthquake_file_as_docs(file_path: str) -> List[Document]:
             f"Unable to decode file with any encoding {encodings_to_try}. Last error: {last_error}"
         )
 
-    documents: List[Document] = []
-
     with file_handle:
         reader = csv.DictReader(file_handle, delimiter=",")
 
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"Earthquake file not found: {file_path}")
 
-        documents = []
-
         # INGV TXT uses "|" as delimiter
         with open(file_path, "r", encoding="utf-8", errors="replace") as f:
             reader = csv.DictReader(f, delimiter="|")
@@ -78,16 +78,99 @@ def load_earthquake_file_as_docs(file_path: str) -> List[Document]:
                     f"Catalog: {row.get('Catalog', '')}\n"
                 )
 
-                documents.append(
-                    Document(
-                        page_content=event_text,
-                        metadata={
-                            "event_id": row.get("EventID", "")
-                        }
-                    )
+                yield Document(
+                    page_content=event_text,
+                    metadata={
+                        "event_id": row.get("EventID", "")
+                    }
                 )
 
-    return documents
+
+# ============================================================
+# PARALLEL PROCESSING
+# ============================================================
+
+# Below this catalog size (~20k INGV rows), worker start-up costs more than it saves
+PARALLEL_MIN_BYTES = 2_500_000
+
+# Events cleaned per pool round trip while streaming
+CLEAN_BLOCK_SIZE = 4096
+
+
+def clean_documents(documents: Iterable[Document], cleaner: TextCleaner,
+                    workers: int = 1) -> Iterator[Document]:
+    """
+    Clean documents in place as they stream in, yielding each one.
+    With workers > 1, blocks of events are cleaned across processes.
+    """
+    if workers <= 1:
+        yield from cleaner.clean_stream(documents)
+        return
+
+    with multiprocessing.Pool(workers) as pool:
+        for block in _blocks(documents, CLEAN_BLOCK_SIZE):
+            cleaned = pool.map(cleaner.clean, [doc.page_content for doc in block], chunksize=256)
+            for doc, text in zip(block, cleaned):
+                doc.page_content = text
+                yield doc
+
+
+def _blocks(documents: Iterable[Document], size: int) -> Iterator[List[Document]]:
+    """Group a document stream into lists of at most `size` documents."""
+    block = []
+    for doc in documents:
+        block.append(doc)
+        if len(block) == size:
+            yield block
+            block = []
+    if block:
+        yield block
+
+
+# ============================================================
+# INDEX CACHE
+# ============================================================
+
+CHUNK_SIZE = 400
+CHUNK_OVERLAP = 40
+
+
+def index_fingerprint(file_path: str, embedding_model) -> str:
+    """
+    SHA-256 of everything the saved index depends on: the catalog file
+    (name, mtime, size), the chunking and the embedding setup.
+    """
+    stat = os.stat(file_path)
+    digest = hashlib.sha256()
+    digest.update(f"{embedding_model.model_name}|{embedding_model.precision}|{os.getenv('EMBED_ENDPOINT', '')}\n".encode())
+    digest.update(f"{CHUNK_SIZE}|{CHUNK_OVERLAP}\n".encode())
+    digest.update(f"{os.path.basename(file_path)}|{stat.st_mtime_ns}|{stat.st_size}\n".encode())
+    return digest.hexdigest()
+
+
+def load_cached_index(manager: VectorStoreManager, index_dir: str, fingerprint: str) -> bool:
+    """Load the saved index if it was built from the same inputs. Returns True on success."""
+    try:
+        with open(os.path.join(index_dir, "data.sha256"), "r", encoding="utf-8") as f:
+            if f.read().strip() != fingerprint:
+                return False
+        manager.load(index_dir)
+        return True
+    except FileNotFoundError:
+        return False
+    except Exception as e:
+        print(f"[WARN] Could not load the saved index, rebuilding: {e}")
+        return False
+
+
+def save_cached_index(manager: VectorStoreManager, index_dir: str, fingerprint: str) -> None:
+    """Persist the index, then its fingerprint (so a partial write is never trusted)."""
+    try:
+        manager.save(index_dir)
+        with open(os.path.join(index_dir, "data.sha256"), "w", encoding="utf-8") as f:
+            f.write(fingerprint)
+    except Exception as e:
+        print(f"[WARN] Could not save the vector index: {e}")
 
 
 # ============================================================
@@ -109,32 +192,48 @@ def main():
         print(f"[ERROR] File not found: {earthquakes_file}")
         return
 
-    cleaner = TextCleaner()
-    splitter = TextSplitter(chunk_size=400, chunk_overlap=40)
+    embedding_model = get_embedding_model()
+    vector_manager = VectorStoreManager(embedding_model)
+
+    # Reuse the index saved by a previous run unless the catalog, the
+    # chunking or the embedding setup changed since
+    index_dir = os.path.join(PROJECT_ROOT, ".cache", "verify_index")
+    fingerprint = index_fingerprint(earthquakes_file, embedding_model)
+
+    if load_cached_index(vector_manager, index_dir, fingerprint):
+        print(f"→ Reusing vector index from {index_dir}")
+        print(f"✓ Loaded {vector_manager.index.ntotal} indexed chunks.\n")
+    else:
+        cleaner = TextCleaner()
+        splitter = TextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+
+        large = os.path.getsize(earthquakes_file) >= PARALLEL_MIN_BYTES
+        workers = max(1, (os.cpu_count() or 1) - 1) if large else 1
+
+        # Read -> clean -> split as one stream: on the sequential path no
+        # list of raw or cleaned events is ever built
+        print(f"→ Reading, cleaning and splitting: {earthquakes_file}")
+        raw_events = load_earthquake_file_as_docs(earthquakes_file)
+        event_chunks = splitter.split_documents(
+            clean_documents(raw_events, cleaner, workers=workers), workers=workers
+        )
+        print(f"✓ Generated {len(event_chunks)} chunks.\n")
 
-    print(f"→ Reading file: {earthquakes_file}")
-    raw_events = load_earthquake_file_as_docs(earthquakes_file)
-    print(f"✓ Loaded {len(raw_events)} earthquake events.")
+        # 2. Build vector store
+        print("[2] Building vector store index...")
 
-    print("→ Cleaning text...")
-    for doc in raw_events:
-        doc.page_content = cleaner.clean(doc.page_content)
+        # Distance kernels depend on the SIMD level the FAISS build dispatches to
+        import faiss
+        print(f"→ FAISS {faiss.__version__} ({faiss.get_compile_options().strip()})")
 
-    print("→ Splitting into chunks...")
-    event_chunks = splitter.split_documents(raw_events)
-    print(f"✓ Generated {len(event_chunks)} chunks.\n")
+        try:
+            vector_manager.create_index(event_chunks)
+            print("✓ Vector index successfully built.\n")
+        except Exception as e:
+            print(f"[ERROR] Failed to build vector index: {e}")
+            return
 
-    # 2. Build vector store
-    print("[2] Building vector store index...")
-
-    try:
-        embedding_model = EmbeddingModel()
-        vector_manager = VectorStoreManager(embedding_model)
-        vector_manager.create_index(event_chunks)
-        print("✓ Vector index successfully built.\n")
-    except Exception as e:
-        print(f"[ERROR] Failed to build vector index: {e}")
-        return
+        save_cached_index(vector_manager, index_dir, fingerprint)
 
     # 3. Test retrieval
     print("[3] Testing retrieval engine...\n")
@@ -147,13 +246,16 @@ def main():
         "Terremoti recenti vicino alla Sicilia o Calabria",
     ]
 
-    for query in sample_queries:
-        print(f"🔍 Query: {query}")
-        results = retriever.retrieve_with_logs(query, k=3)
-        print("→ Retrieved results:")
+    # All sample queries embedded and searched in one batch
+    batch_results = retriever.retrieve_batch_with_logs(sample_queries, k=3)
+
+    for query, results in zip(sample_queries, batch_results):
+        # One stdout write per query instead of two per retrieved chunk
+        buf = io.StringIO()
+        buf.write(f"🔍 Query: {query}\n→ Retrieved results:\n")
         for log in results["logs"]:
-            print(f"  [{log['rank']}] Score: {log['score']:.4f} ")
-            print(f"      Snippet: {log['content_snippet']}\n")
+            buf.write(f"  [{log['rank']}] Score: {log['score']:.4f} \n      Snippet: {log['content_snippet']}\n\n")
+        sys.stdout.write(buf.getvalue())
 
     print("\n=== SYSTEM READY ===\n")
 
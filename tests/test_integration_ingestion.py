@@ -52,4 +52,99 @@ def test_full_earthquake_ingestion_pipeline(tmp_path):
     # Check chunk size and metadata
     for chunk in chunks:
         assert len(chunk.page_content) <= 80
-        assert chunk.metadata["event_id"] == "12345"
\ No newline at end of file
+        assert chunk.metadata["event_id"] == "12345"
+
+def test_earthquake_loader_tolerates_ragged_rows(tmp_path):
+    """Rows with missing trailing fields must still load (csv fallback)."""
+    file_content = (
+        "EventID|Time|Latitude|Magnitude|MagType\n"
+        "111|2025-02-11T10:20:30|40.1|3.2|ML\n"
+        "222|2025-02-11T11:00:00\n"
+    )
+    file_path = tmp_path / "ragged.txt"
+    file_path.write_text(file_content, encoding="utf-8")
+
+    docs = EarthquakeLoader().load_txt(str(file_path))
+
+    assert [d.metadata["event_id"] for d in docs] == ["111", "222"]
+    assert "Magnitude: 3.2 (ML)" in docs[0].page_content
+    assert "Date/Time: 2025-02-11T11:00:00" in docs[1].page_content
+
+
+def test_splitter_passes_short_documents_through():
+    splitter = TextSplitter(chunk_size=100, chunk_overlap=20)
+    short = Document(page_content="Event ID: 1", metadata={"event_id": "1"})
+    long = Document(page_content="word " * 50, metadata={"event_id": "2"})
+
+    chunks = splitter.split_documents([short, long])
+
+    # Short document kept as-is and in order, long one split
+    assert chunks[0] is short
+    assert len(chunks) > 2
+    assert all(c.metadata["event_id"] == "2" for c in chunks[1:])
+
+
+def test_splitter_from_tokenizer_measures_tokens():
+    class WordTokenizer:
+        def encode(self, text):
+            return text.split()
+
+    splitter = TextSplitter.from_tokenizer(WordTokenizer(), chunk_size=10, chunk_overlap=2)
+    chunks = splitter.split_text(" ".join(f"w{i}" for i in range(30)))
+
+    assert len(chunks) > 1
+    assert all(len(c.split()) <= 10 for c in chunks)
+
+
+def test_cleaner_trims_lines_and_drops_blank_ones():
+    cleaner = TextCleaner()
+
+    assert cleaner.clean("  Event ID:\t 1 \r\n\r\n  Magnitude:  3.2  \n") == "Event ID: 1\nMagnitude: 3.2"
+    # Non-ASCII text gets the same treatment, Unicode whitespace included
+    assert cleaner.clean(" Località:  Modica \n\n Città ") == "Località: Modica\nCittà"
+
+
+def test_splitter_parallel_split_matches_sequential():
+    splitter = TextSplitter(chunk_size=100, chunk_overlap=20)
+    docs = [
+        Document(page_content=("word " * 50) if i % 2 else f"Event ID: {i}", metadata={"event_id": str(i)})
+        for i in range(8)
+    ]
+
+    sequential = splitter.split_documents(docs)
+    parallel = splitter.split_documents(docs, workers=2)
+
+    assert [(c.page_content, c.metadata) for c in parallel] == \
+        [(c.page_content, c.metadata) for c in sequential]
+
+
+def test_clean_stream_and_split_consume_a_generator():
+    cleaner = TextCleaner()
+    splitter = TextSplitter(chunk_size=100, chunk_overlap=20)
+
+    def events():
+        yield Document(page_content="  Event ID:   1  \n\n", metadata={"event_id": "1"})
+        yield Document(page_content="word  " * 50, metadata={"event_id": "2"})
+
+    chunks = splitter.split_documents(cleaner.clean_stream(events()))
+
+    assert chunks[0].page_content == "Event ID: 1"
+    assert len(chunks) > 2
+    assert all("  " not in c.page_content for c in chunks)
+
+
+def test_split_and_clean_matches_separate_passes():
+    cleaner = TextCleaner()
+    splitter = TextSplitter(chunk_size=100, chunk_overlap=20)
+    texts = ["  Event ID:   1  \n\n Magnitude: 3.2 ", "word   " * 50, "   "]
+
+    fused = []
+    for text in texts:
+        fused.extend(splitter.split_and_clean(Document(page_content=text), cleaner))
+
+    separate = splitter.split_documents(
+        [Document(page_content=cleaner.clean(text)) for text in texts]
+    )
+
+    assert [c.page_content for c in fused] == [c.page_content for c in separate]
+    assert fused[0].page_content == "Event ID: 1\nMagnitude: 3.2"
@@ -1,6 +1,8 @@
+import asyncio
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from langchain_core.documents import Document
+from src.prompts import create_rag_prompt_template, split_rag_system_prompt
 from src.rag import RAGChain
 
 
@@ -12,7 +14,7 @@ def test_rag_chain_answer():
     ]
 
     # --- Mock LLM (ChatGroq) ---
-    with patch("src.rag.ChatGroq") as MockLLM:
+    with patch("langchain_groq.ChatGroq") as MockLLM:
         mock_llm_instance = MockLLM.return_value
         mock_llm_instance.invoke.return_value.content = "Answer based on context"
 
@@ -36,7 +38,7 @@ def test_rag_chain_no_context():
     mock_retriever = MagicMock()
     mock_retriever.retrieve.return_value = []
 
-    with patch("src.rag.ChatGroq") as MockLLM:
+    with patch("langchain_groq.ChatGroq") as MockLLM:
         mock_llm_instance = MockLLM.return_value
         mock_llm_instance.invoke.return_value.content = \
             "Non lo so in base ai documenti forniti."
@@ -62,4 +64,160 @@ def test_rag_chain_no_context():
         assert "context" in system_msg or "contesto" in system_msg
 
         # retriever was called
-        mock_retriever.retrieve.assert_called_once_with("test query")
\ No newline at end of file
+        mock_retriever.retrieve.assert_called_once_with("test query")
+
+def test_rag_chain_answer_batch():
+    mock_retriever = MagicMock()
+    mock_retriever.retrieve_batch.return_value = [
+        [Document(page_content="context A")],
+        [],
+    ]
+
+    with patch("langchain_groq.ChatGroq") as MockLLM:
+        mock_llm_instance = MockLLM.return_value
+        first, second = MagicMock(), MagicMock()
+        first.content = "Answer A"
+        second.content = "Non lo so in base ai documenti forniti."
+        mock_llm_instance.batch.return_value = [first, second]
+
+        chain = RAGChain(retriever=mock_retriever)
+
+        responses = chain.answer_batch(["query A", "query B"])
+
+        assert [r["answer"] for r in responses] == [
+            "Answer A", "Non lo so in base ai documenti forniti."
+        ]
+        assert responses[0]["source_documents"][0].page_content == "context A"
+        assert responses[1]["source_documents"] == []
+
+        # One retrieval pass and one batched LLM call
+        mock_retriever.retrieve_batch.assert_called_once_with(["query A", "query B"])
+        mock_llm_instance.batch.assert_called_once()
+        assert len(mock_llm_instance.batch.call_args[0][0]) == 2
+        mock_llm_instance.invoke.assert_not_called()
+
+
+def test_rag_chain_astream_yields_tokens():
+    mock_retriever = MagicMock()
+    mock_retriever.retrieve.return_value = [Document(page_content="context info 123")]
+
+    async def fake_astream(prompt):
+        for token in ["Answer ", "based ", "", "on context"]:
+            chunk = MagicMock()
+            chunk.content = token
+            yield chunk
+
+    with patch("langchain_groq.ChatGroq") as MockLLM:
+        mock_llm_instance = MockLLM.return_value
+        mock_llm_instance.astream.side_effect = fake_astream
+
+        chain = RAGChain(retriever=mock_retriever)
+
+        async def collect():
+            return [token async for token in chain.astream("test query")]
+
+        tokens = asyncio.run(collect())
+
+        # Empty chunks are dropped
+        assert tokens == ["Answer ", "based ", "on context"]
+        mock_retriever.retrieve.assert_called_once_with("test query")
+
+        prompt = mock_llm_instance.astream.call_args[0][0]
+        assert "context info 123" in prompt.to_messages()[0].content
+
+
+def test_rag_chain_stream_yields_tokens():
+    mock_retriever = MagicMock()
+    documents = [Document(page_content="context info 123")]
+
+    def fake_stream(prompt):
+        for token in ["Answer ", "", "on context"]:
+            chunk = MagicMock()
+            chunk.content = token
+            yield chunk
+
+    with patch("langchain_groq.ChatGroq") as MockLLM:
+        mock_llm_instance = MockLLM.return_value
+        mock_llm_instance.stream.side_effect = fake_stream
+
+        chain = RAGChain(retriever=mock_retriever)
+
+        # Context retrieved by the caller is not fetched again
+        tokens = list(chain.stream("test query", documents=documents))
+
+        assert tokens == ["Answer ", "on context"]
+        mock_retriever.retrieve.assert_not_called()
+        mock_llm_instance.astream.assert_not_called()
+
+        prompt = mock_llm_instance.stream.call_args[0][0]
+        assert "context info 123" in prompt.to_messages()[0].content
+
+
+def test_rag_chain_aanswer():
+    mock_retriever = MagicMock()
+    mock_retriever.retrieve.return_value = [Document(page_content="context info 123")]
+
+    with patch("langchain_groq.ChatGroq") as MockLLM:
+        mock_llm_instance = MockLLM.return_value
+        mock_llm_instance.ainvoke = AsyncMock()
+        mock_llm_instance.ainvoke.return_value.content = "Answer based on context"
+
+        chain = RAGChain(retriever=mock_retriever)
+
+        response = asyncio.run(chain.aanswer("test query"))
+
+        assert response["answer"] == "Answer based on context"
+        assert response["source_documents"][0].page_content == "context info 123"
+        mock_llm_instance.ainvoke.assert_awaited_once()
+        mock_llm_instance.invoke.assert_not_called()
+
+
+def test_rag_chain_context_bounded_by_char_budget():
+    mock_retriever = MagicMock()
+    mock_retriever.retrieve.return_value = [
+        Document(page_content="a" * 40),
+        Document(page_content="b" * 40),
+        Document(page_content="c" * 40),
+    ]
+
+    with patch("langchain_groq.ChatGroq") as MockLLM:
+        mock_llm_instance = MockLLM.return_value
+        mock_llm_instance.invoke.return_value.content = "Answer"
+
+        chain = RAGChain(retriever=mock_retriever)
+        chain.max_context_chars = 90
+
+        response = chain.answer("test query")
+
+        # Only the documents that fit are sent and reported as sources
+        assert [d.page_content[0] for d in response["source_documents"]] == ["a", "b"]
+        system_prompt = response["generated_prompt"].to_messages()[0].content
+        assert "b" * 40 in system_prompt
+        assert "c" * 40 not in system_prompt
+
+        # The best match is kept even when it alone exceeds the budget
+        chain.max_context_chars = 10
+        assert len(chain.select_context(mock_retriever.retrieve.return_value)) == 1
+
+
+def test_rag_chain_system_prompt_has_no_trailing_spaces():
+    mock_retriever = MagicMock()
+    mock_retriever.retrieve.return_value = [Document(page_content="context info 123")]
+
+    with patch("langchain_groq.ChatGroq") as MockLLM:
+        MockLLM.return_value.invoke.return_value.content = "Answer"
+
+        chain = RAGChain(retriever=mock_retriever)
+        response = chain.answer("test query")
+
+        system_prompt = response["generated_prompt"].to_messages()[0].content
+        assert "context info 123" in system_prompt
+        assert all(line == line.rstrip() for line in system_prompt.split("\n"))
+
+
+def test_split_rag_system_prompt_matches_template():
+    prefix, suffix = split_rag_system_prompt()
+
+    rendered = create_rag_prompt_template().format_messages(context="CTX", question="q")[0].content
+    stripped = "\n".join(line.rstrip() for line in rendered.split("\n"))
+    assert prefix + "CTX" + suffix == stripped
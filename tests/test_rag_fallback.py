@@ -16,7 +16,7 @@ def test_fallback_when_retrieval_empty():
     mock_retriever.retrieve.return_value = []   # No INGV events
 
     # --- Mock LLM (ChatGroq) ---
-    with patch("src.rag.ChatGroq") as MockChat:
+    with patch("langchain_groq.ChatGroq") as MockChat:
         mock_llm = MockChat.return_value
 
         # Expected fallback according to your Earthquake RAG system rules
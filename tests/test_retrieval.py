@@ -1,20 +1,36 @@
+import numpy as np
 import pytest
 from unittest.mock import MagicMock
+from langchain_community.vectorstores.utils import DistanceStrategy
 from langchain_core.documents import Document
 from src.retrieval import Retriever
+from src.vectorizer import EmbeddingModel, VectorStoreManager
 
 
-def test_retrieve_documents():
+def _mock_index_search(mock_manager, docs, scores):
+    """Make manager.index.search return the given documents (one query row)."""
+    ids = [f"id{i}" for i in range(len(docs))]
+    mock_manager.index_to_docstore_id = dict(enumerate(ids))
+    mock_manager.vector_store.docstore.search.side_effect = dict(zip(ids, docs)).get
+
+    def search(Q, k, params=None, D=None, I=None):
+        D[:] = -1.0
+        I[:] = -1
+        D[0, :len(scores)] = scores
+        I[0, :len(docs)] = range(len(docs))
+        return D, I
+
+    mock_manager.index.search.side_effect = search
+
+
+def test_retrieve_documents(monkeypatch):
+    monkeypatch.setenv("HNSW_EF_SEARCH", "100")
     # Mock vector store manager
     mock_manager = MagicMock()
-
-    # Mock retriever returned by manager.get_retriever()
-    mock_retriever = MagicMock()
-    mock_manager.get_retriever.return_value = mock_retriever
+    mock_manager.embedding_model.embed_query.return_value = [0.1, 0.2]
 
     # Mock FAISS results
-    expected_docs = [Document(page_content="Event: magnitude 3.5")]
-    mock_retriever.invoke.return_value = expected_docs
+    _mock_index_search(mock_manager, [Document(page_content="Event: magnitude 3.5")], [0.9])
 
     retriever = Retriever(vector_store_manager=mock_manager)
 
@@ -25,9 +41,27 @@ def test_retrieve_documents():
     assert len(results) == 1
     assert results[0].page_content == "Event: magnitude 3.5"
 
-    # Verify retriever interactions
-    mock_manager.get_retriever.assert_called_once()
-    mock_retriever.invoke.assert_called_with("terremoti in Sicilia")
+    # Verify the query is embedded once and searched by vector
+    mock_manager.embedding_model.embed_query.assert_called_once_with("terremoti in Sicilia")
+    (Q, k), kwargs = mock_manager.index.search.call_args
+    np.testing.assert_allclose(Q, [[0.1, 0.2]])
+    assert k == 8
+
+    # Same per-call search parameters as retrieve_with_logs
+    mock_manager.search_params.assert_called_once_with(ef_search=100, nprobe=None)
+    assert kwargs["params"] is mock_manager.search_params.return_value
+
+
+def test_retrieve_and_retrieve_with_logs_share_query_embedding():
+    mock_manager = MagicMock()
+    mock_manager.embedding_model.embed_query.return_value = [0.1, 0.2]
+    _mock_index_search(mock_manager, [], [])
+    retriever = Retriever(vector_store_manager=mock_manager)
+
+    retriever.retrieve("terremoti in Sicilia")
+    retriever.retrieve_with_logs("terremoti in Sicilia")
+
+    mock_manager.embedding_model.embed_query.assert_called_once()
 
 
 def test_retrieve_empty_query_returns_empty_list():
@@ -40,21 +74,15 @@ def test_retrieve_empty_query_returns_empty_list():
 
 
 def test_retrieve_with_logs_basic():
-    # Mock FAISS vector store
     mock_manager = MagicMock()
-    mock_vector_store = MagicMock()
-    mock_manager.vector_store = mock_vector_store
 
-    # Simulated FAISS return: (doc, score)
     doc1 = Document(page_content="Event ID: 111, Magnitudo 3.2",
                     metadata={"source": "file1.txt"})
     doc2 = Document(page_content="Event ID: 222, Magnitudo 4.1",
                     metadata={"source": "file2.txt"})
 
-    mock_vector_store.similarity_search_with_score.return_value = [
-        (doc1, 1.23),
-        (doc2, 1.56)
-    ]
+    mock_manager.embedding_model.embed_query.return_value = [0.1, 0.2]
+    _mock_index_search(mock_manager, [doc1, doc2], [1.23, 1.56])
 
     retriever = Retriever(vector_store_manager=mock_manager)
 
@@ -63,7 +91,7 @@ def test_retrieve_with_logs_basic():
     # Validate structure
     assert "results" in result
     assert "logs" in result
-    assert len(result["results"]) == 2
+    assert result["results"] == [doc1, doc2]
     assert len(result["logs"]) == 2
 
     # Validate first log
@@ -73,10 +101,179 @@ def test_retrieve_with_logs_basic():
     assert log1["source"] == "file1.txt"
     assert isinstance(log1["score"], float)
 
-    # Ensure FAISS was called
-    mock_vector_store.similarity_search_with_score.assert_called_with(
-        "terremoti profondi", k=2
+    # Ensure FAISS was called with the query embedding
+    mock_manager.embedding_model.embed_query.assert_called_once_with("terremoti profondi")
+    (Q, k), _ = mock_manager.index.search.call_args
+    np.testing.assert_allclose(Q, [[0.1, 0.2]])
+    assert k == 2
+
+    # No override requested: the build-time search parameters are used
+    mock_manager.search_params.assert_called_once_with(ef_search=None, nprobe=None)
+    mock_manager.set_ef_search.assert_not_called()
+
+
+def test_retrieve_with_logs_ef_search_override(monkeypatch):
+    mock_manager = MagicMock()
+    _mock_index_search(mock_manager, [], [])
+    retriever = Retriever(vector_store_manager=mock_manager)
+
+    monkeypatch.setenv("HNSW_EF_SEARCH", "100")
+    retriever.retrieve_with_logs("terremoti profondi", k=20)
+    mock_manager.search_params.assert_called_with(ef_search=100, nprobe=None)
+
+    retriever.retrieve_with_logs("terremoti profondi", k=20, ef_search=40)
+    mock_manager.search_params.assert_called_with(ef_search=40, nprobe=None)
+
+    # Passed with the search call, never set on the shared index
+    _, kwargs = mock_manager.index.search.call_args
+    assert kwargs["params"] is mock_manager.search_params.return_value
+    mock_manager.set_ef_search.assert_not_called()
+
+
+def test_retrieve_with_logs_nprobe_override(monkeypatch):
+    mock_manager = MagicMock()
+    _mock_index_search(mock_manager, [], [])
+    retriever = Retriever(vector_store_manager=mock_manager)
+
+    monkeypatch.setenv("IVF_NPROBE", "8")
+    retriever.retrieve_with_logs("terremoti profondi")
+    mock_manager.search_params.assert_called_with(ef_search=None, nprobe=8)
+
+    retriever.retrieve_with_logs("terremoti profondi", nprobe=64)
+    mock_manager.search_params.assert_called_with(ef_search=None, nprobe=64)
+    mock_manager.set_nprobe.assert_not_called()
+
+
+def test_retrieve_with_logs_leaves_shared_hnsw_index_untouched():
+    manager = VectorStoreManager(embedding_model=MagicMock(spec=EmbeddingModel))
+    manager.embedding_model.embeddings = MagicMock()
+    manager.embedding_model.encode.return_value = np.eye(4, dtype=np.float32)
+    manager.embedding_model.embed_query.return_value = [1.0, 0.0, 0.0, 0.0]
+    manager.create_index([Document(page_content=f"Event ID: {i}") for i in range(4)])
+    retriever = Retriever(vector_store_manager=manager)
+
+    result = retriever.retrieve_with_logs("terremoti profondi", k=2, ef_search=10)
+
+    assert result["results"][0].page_content == "Event ID: 0"
+    assert manager.index.hnsw.efSearch == VectorStoreManager.HNSW_EF_SEARCH
+
+
+def test_retrieve_with_logs_reuses_cached_query_embedding():
+    mock_manager = MagicMock()
+    mock_manager.embedding_model.embed_query.return_value = [0.1, 0.2]
+    _mock_index_search(mock_manager, [], [])
+    retriever = Retriever(vector_store_manager=mock_manager)
+
+    retriever.retrieve_with_logs("terremoti profondi")
+    retriever.retrieve_with_logs("  terremoti   profondi ")
+
+    # Same normalized query: the model runs once
+    mock_manager.embedding_model.embed_query.assert_called_once_with("terremoti profondi")
+    assert mock_manager.index.search.call_count == 2
+
+
+def test_retriever_query_cache_is_bounded():
+    mock_manager = MagicMock()
+    mock_manager.embedding_model.embed_query.side_effect = lambda q: [float(len(q))]
+    retriever = Retriever(vector_store_manager=mock_manager)
+    retriever.QUERY_CACHE_SIZE = 2
+
+    for query in ["a", "bb", "ccc"]:
+        retriever._embed_query(query)
+
+    # Least recently used query evicted
+    assert list(retriever._query_cache) == ["bb", "ccc"]
+
+
+def test_retriever_query_cache_is_thread_safe():
+    from concurrent.futures import ThreadPoolExecutor
+
+    mock_manager = MagicMock()
+    mock_manager.embedding_model.embed_query.side_effect = lambda q: [float(len(q))]
+    retriever = Retriever(vector_store_manager=mock_manager)
+    retriever.QUERY_CACHE_SIZE = 4
+
+    # Many threads hitting and evicting the same small cache
+    queries = [f"terremoto {i % 16}" for i in range(2000)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        vectors = list(executor.map(retriever._embed_query, queries))
+
+    assert vectors == [[float(len(q))] for q in queries]
+    assert len(retriever._query_cache) <= 4
+
+
+def test_retrieve_with_logs_converts_l2_distances_to_cosine():
+    mock_manager = MagicMock()
+    mock_manager.vector_store.distance_strategy = DistanceStrategy.EUCLIDEAN_DISTANCE
+    mock_manager.embedding_model.embed_query.return_value = [0.1, 0.2]
+    _mock_index_search(
+        mock_manager,
+        [Document(page_content="Event ID: 111"), Document(page_content="Event ID: 222")],
+        [0.0, 1.0],
     )
+    retriever = Retriever(vector_store_manager=mock_manager)
+
+    logs = retriever.retrieve_with_logs("terremoti profondi", k=2)["logs"]
+
+    # Squared L2 between unit vectors: cos = 1 - d / 2
+    assert [log["score"] for log in logs] == pytest.approx([1.0, 0.5])
+
+
+def test_retrieve_batch_with_logs_scores_each_query():
+    mock_manager = MagicMock()
+    mock_manager.vector_store.distance_strategy = DistanceStrategy.MAX_INNER_PRODUCT
+    mock_manager.embedding_model.encode.return_value = np.ones((2, 3), dtype=np.float32)
+    mock_manager.index.search.return_value = (
+        np.array([[0.9, 0.5], [0.7, 0.0]], dtype=np.float32),
+        np.array([[0, 1], [1, -1]]),
+    )
+    mock_manager.index_to_docstore_id = {0: "a", 1: "b"}
+
+    doc_a = Document(page_content="Event ID: 111", metadata={"source": "file1.txt"})
+    doc_b = Document(page_content="Event ID: 222", metadata={"source": "file2.txt"})
+    mock_manager.vector_store.docstore.search.side_effect = {"a": doc_a, "b": doc_b}.get
+
+    retriever = Retriever(vector_store_manager=mock_manager)
+
+    batch = retriever.retrieve_batch_with_logs(["terremoti in Sicilia", "eventi profondi"], k=2)
+
+    assert [r["results"] for r in batch] == [[doc_a, doc_b], [doc_b]]
+    assert [log["score"] for log in batch[0]["logs"]] == pytest.approx([0.9, 0.5])
+    assert [log["score"] for log in batch[1]["logs"]] == pytest.approx([0.7])
+    assert batch[1]["logs"][0]["rank"] == 1
+    assert batch[1]["logs"][0]["source"] == "file2.txt"
+    mock_manager.index.search.assert_called_once()
+
+
+def test_retrieve_batch_with_logs_search_overrides(monkeypatch):
+    mock_manager = MagicMock()
+    mock_manager.embedding_model.encode.return_value = np.ones((1, 3), dtype=np.float32)
+    _mock_index_search(mock_manager, [], [])
+    retriever = Retriever(vector_store_manager=mock_manager)
+
+    monkeypatch.setenv("IVF_NPROBE", "8")
+    retriever.retrieve_batch_with_logs(["terremoti profondi"])
+    mock_manager.search_params.assert_called_with(ef_search=None, nprobe=8)
+
+    retriever.retrieve_batch_with_logs(["terremoti profondi"], ef_search=40, nprobe=64)
+    mock_manager.search_params.assert_called_with(ef_search=40, nprobe=64)
+
+    _, kwargs = mock_manager.index.search.call_args
+    assert kwargs["params"] is mock_manager.search_params.return_value
+    mock_manager.set_nprobe.assert_not_called()
+
+
+def test_retrieve_batch_with_logs_empty_batch_skips_store():
+    mock_manager = MagicMock()
+    mock_manager.vector_store = None
+    retriever = Retriever(vector_store_manager=mock_manager)
+
+    assert retriever.retrieve_batch_with_logs([]) == []
+    assert retriever.retrieve_batch_with_logs(["", "   "]) == [
+        {"results": [], "logs": []},
+        {"results": [], "logs": []},
+    ]
+    mock_manager.index.search.assert_not_called()
 
 
 def test_retrieve_with_logs_empty_query():
@@ -96,4 +293,34 @@ def test_retrieve_with_logs_vectorstore_not_initialized():
     retriever = Retriever(vector_store_manager=mock_manager)
 
     with pytest.raises(ValueError):
-        retriever.retrieve_with_logs("terremoti nel Tirreno", k=3)
\ No newline at end of file
+        retriever.retrieve_with_logs("terremoti nel Tirreno", k=3)
+
+def test_retrieve_batch_single_search_for_all_queries():
+    mock_manager = MagicMock()
+    mock_manager.embedding_model.encode.return_value = np.ones((2, 3), dtype=np.float32)
+    mock_manager.index.search.return_value = (
+        np.zeros((2, 2), dtype=np.float32),
+        np.array([[0, 1], [1, -1]]),
+    )
+    mock_manager.index_to_docstore_id = {0: "a", 1: "b"}
+
+    doc_a = Document(page_content="Event ID: 111")
+    doc_b = Document(page_content="Event ID: 222")
+    mock_manager.vector_store.docstore.search.side_effect = {"a": doc_a, "b": doc_b}.get
+
+    retriever = Retriever(vector_store_manager=mock_manager)
+
+    results = retriever.retrieve_batch(
+        ["terremoti in Sicilia", "   ", "eventi profondi"], k=2
+    )
+
+    assert results == [[doc_a, doc_b], [], [doc_b]]
+
+    # Non-empty queries are embedded and searched together
+    mock_manager.embedding_model.encode.assert_called_once_with(
+        ["terremoti in Sicilia", "eventi profondi"]
+    )
+    mock_manager.index.search.assert_called_once()
+    _, kwargs = mock_manager.index.search.call_args
+    assert kwargs["D"].shape == (2, 2) and kwargs["D"].dtype == np.float32
+    assert kwargs["I"].shape == (2, 2) and kwargs["I"].dtype == np.int64
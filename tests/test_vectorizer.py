@@ -1,20 +1,204 @@
+import json
+import faiss
+import httpx
+import numpy as np
 import pytest
 from unittest.mock import MagicMock, patch
+from langchain_community.vectorstores.utils import DistanceStrategy
 from langchain_core.documents import Document
-from src.vectorizer import EmbeddingModel, VectorStoreManager
+from src.vectorizer import (
+    EmbeddingModel,
+    RemoteEmbeddings,
+    VectorStoreManager,
+    clear_embedding_cache,
+    get_embedding_model,
+)
 
 # ============================================================
 # EMBEDDING MODEL TESTS (Earthquake Domain)
 # ============================================================
 
 def test_embedding_model_initialization():
-    with patch("src.vectorizer.HuggingFaceEmbeddings") as MockEmbeddings:
-        model = EmbeddingModel()
+    with patch("langchain_community.embeddings.HuggingFaceEmbeddings") as MockEmbeddings:
+        model = EmbeddingModel(precision="fp32")
         MockEmbeddings.assert_called_once()
 
+        encode_kwargs = MockEmbeddings.call_args.kwargs["encode_kwargs"]
+        assert encode_kwargs == {
+            "batch_size": EmbeddingModel.BATCH_SIZE,
+            "normalize_embeddings": True,
+        }
+
+
+def test_embedding_model_half_precision_skips_sentence_transformers():
+    with patch("langchain_community.embeddings.HuggingFaceEmbeddings") as MockEmbeddings, \
+            patch("src.vectorizer.HalfPrecisionEmbeddings") as MockHalf:
+        model = EmbeddingModel(precision="bf16")
+
+        MockEmbeddings.assert_not_called()
+        assert MockHalf.call_args.kwargs["dtype"] == "bf16"
+        assert model.st_model is None
+
+
+@pytest.mark.parametrize("capability, expected", [((7, 5), "fp16"), ((8, 0), "bf16"), ((9, 0), "bf16")])
+def test_default_precision_uses_native_bf16_only(capability, expected):
+    from src.vectorizer import _default_precision
+
+    with patch("torch.cuda.get_device_capability", return_value=capability), \
+            patch("torch.cuda.is_bf16_supported", return_value=True):
+        assert _default_precision("cuda") == expected
+    assert _default_precision("cpu") == "fp32"
+
+
+def test_embedding_model_int8_uses_onnx_runtime():
+    with patch("langchain_community.embeddings.HuggingFaceEmbeddings") as MockEmbeddings, \
+            patch("src.vectorizer.OnnxEmbeddings") as MockOnnx:
+        model = EmbeddingModel(precision="int8")
+
+        MockEmbeddings.assert_not_called()
+        MockOnnx.assert_called_once()
+        assert model.embeddings is MockOnnx.return_value
+
+
+def test_embedding_model_uses_remote_endpoint_when_configured(monkeypatch):
+    monkeypatch.setenv("EMBED_ENDPOINT", "http://localhost:8080/v1/embeddings")
+    with patch("langchain_community.embeddings.HuggingFaceEmbeddings") as MockEmbeddings, \
+            patch("src.vectorizer.RemoteEmbeddings") as MockRemote:
+        model = EmbeddingModel()
+
+        MockEmbeddings.assert_not_called()
+        MockRemote.assert_called_once_with(
+            "http://localhost:8080/v1/embeddings", EmbeddingModel.DEFAULT_MODEL
+        )
+        assert model.precision == "remote"
+        assert model.embeddings is MockRemote.return_value
+
+
+def _embedding_server(requests):
+    """httpx transport answering like an OpenAI-compatible embeddings route."""
+    def handler(request):
+        body = json.loads(request.content)
+        requests.append(body["input"])
+        # Out of order on purpose: results are matched back by index
+        data = [{"index": i, "embedding": [float(len(t)), 0.0]} for i, t in enumerate(body["input"])]
+        return httpx.Response(200, json={"data": data[::-1]})
+
+    return httpx.MockTransport(handler)
+
+
+def test_remote_embeddings_batches_requests_and_normalizes():
+    requests = []
+    transport = _embedding_server(requests)
+    real_client = httpx.Client
+    with patch("httpx.Client", lambda **kwargs: real_client(transport=transport, **kwargs)):
+        remote = RemoteEmbeddings("http://embed/v1/embeddings", "model", batch_size=2)
+        embs = remote.encode(["a", "bb", "ccc"])
+
+    assert sorted(requests) == [["a", "bb"], ["ccc"]]
+    np.testing.assert_allclose(embs, [[1.0, 0.0]] * 3)
+
+
+def test_remote_embeddings_sync_and_async_inside_running_loop():
+    import asyncio
+
+    requests = []
+    transport = _embedding_server(requests)
+    real_client, real_async_client = httpx.Client, httpx.AsyncClient
+    with patch("httpx.Client", lambda **kwargs: real_client(transport=transport, **kwargs)), \
+            patch("httpx.AsyncClient", lambda **kwargs: real_async_client(transport=transport, **kwargs)):
+        remote = RemoteEmbeddings("http://embed/v1/embeddings", "model", batch_size=2)
+
+        async def main():
+            # Sync API called from code that already runs an event loop
+            return remote.embed_query("a"), await remote.aembed_documents(["a", "bb", "ccc"])
+
+        query_vec, doc_vecs = asyncio.run(main())
+
+    assert query_vec == [1.0, 0.0]
+    np.testing.assert_allclose(doc_vecs, [[1.0, 0.0]] * 3)
+
+
+def test_get_embedding_model_remote_ignores_precision_and_skips_warmup(monkeypatch):
+    monkeypatch.setenv("EMBED_ENDPOINT", "http://localhost:8080/v1/embeddings")
+    monkeypatch.setenv("EMBEDDING_PRECISION", "not-a-precision")
+    with patch("src.vectorizer.RemoteEmbeddings") as MockRemote, \
+            patch.dict("src.vectorizer._EMB_CACHE", clear=True):
+        model = get_embedding_model()
+
+        assert model.precision == "remote"
+        MockRemote.return_value.embed_query.assert_not_called()
+
+
+class _StubTokenizer:
+    """Whitespace tokenizer padding to the longest text, like a HF tokenizer."""
+
+    def __call__(self, texts, padding, truncation, max_length, return_tensors):
+        ids = [[sum(map(ord, w)) % 97 + 1 for w in t.split()][:max_length] for t in texts]
+        width = max(len(row) for row in ids)
+        input_ids = np.array([row + [0] * (width - len(row)) for row in ids], dtype=np.int64)
+        encoded = {"input_ids": input_ids, "attention_mask": (input_ids != 0).astype(np.int64)}
+        if return_tensors == "pt":
+            import torch
+            return {k: torch.from_numpy(v) for k, v in encoded.items()}
+        return encoded
+
+
+_TOKEN_TABLE = np.random.default_rng(0).normal(size=(98, 8)).astype(np.float32)
+_STUB_TEXTS = ["M 3.1 Sicilia", "evento profondo nel Tirreno Meridionale", "Calabria", "M 4.8 Etna area nord"]
+
+
+def _assert_pooled_embeddings(embeddings_cls, make_stub):
+    """Shape, unit norm and batch-size independence of a custom encode()."""
+    def encode(batch_size):
+        emb = embeddings_cls.__new__(embeddings_cls)
+        emb.tokenizer = _StubTokenizer()
+        emb.batch_size = batch_size
+        emb.max_length = 16
+        make_stub(emb)
+        return emb.encode(_STUB_TEXTS)
+
+    one_by_one = encode(batch_size=1)
+    together = encode(batch_size=len(_STUB_TEXTS))
+
+    assert together.shape == (len(_STUB_TEXTS), _TOKEN_TABLE.shape[1])
+    assert together.dtype == np.float32
+    np.testing.assert_allclose(np.linalg.norm(together, axis=1), 1.0, rtol=1e-5)
+    np.testing.assert_allclose(one_by_one, together, rtol=1e-5, atol=1e-6)
+
+    # Mean over real tokens only: padding never leaks into the pooled vector
+    ids = _StubTokenizer()([_STUB_TEXTS[2]], True, True, 16, "np")["input_ids"][0]
+    expected = _TOKEN_TABLE[ids].mean(axis=0)
+    np.testing.assert_allclose(together[2], expected / np.linalg.norm(expected), rtol=1e-2, atol=1e-2)
+
+
+def test_half_precision_embeddings_encode_pools_and_normalizes():
+    import torch
+    from src.vectorizer import HalfPrecisionEmbeddings
+
+    table = torch.from_numpy(_TOKEN_TABLE).to(torch.bfloat16)
+
+    def make_stub(emb):
+        emb.device = "cpu"
+        emb.dtype = torch.bfloat16
+        emb.model = MagicMock()
+        emb.model.side_effect = lambda input_ids, attention_mask: MagicMock(last_hidden_state=table[input_ids])
+
+    _assert_pooled_embeddings(HalfPrecisionEmbeddings, make_stub)
+
+
+def test_onnx_embeddings_encode_pools_and_normalizes():
+    from src.vectorizer import OnnxEmbeddings
+
+    def make_stub(emb):
+        emb._input_names = {"input_ids", "attention_mask"}
+        emb.session = MagicMock()
+        emb.session.run.side_effect = lambda outputs, feed: [_TOKEN_TABLE[feed["input_ids"]]]
+
+    _assert_pooled_embeddings(OnnxEmbeddings, make_stub)
+
 
 def test_embed_query_for_earthquake_question():
-    with patch("src.vectorizer.HuggingFaceEmbeddings") as MockEmbeddings:
+    with patch("langchain_community.embeddings.HuggingFaceEmbeddings") as MockEmbeddings:
         mock_instance = MockEmbeddings.return_value
         mock_instance.embed_query.return_value = [0.12, 0.22, 0.32]
 
@@ -28,7 +212,7 @@ def test_embed_query_for_earthquake_question():
 
 
 def test_embed_documents_for_earthquake_chunks():
-    with patch("src.vectorizer.HuggingFaceEmbeddings") as MockEmbeddings:
+    with patch("langchain_community.embeddings.HuggingFaceEmbeddings") as MockEmbeddings:
         mock_instance = MockEmbeddings.return_value
         mock_instance.embed_documents.return_value = [[0.1], [0.2]]
 
@@ -50,9 +234,17 @@ def test_embed_documents_for_earthquake_chunks():
 # VECTOR STORE MANAGER TESTS (Earthquake Domain)
 # ============================================================
 
+def _mock_embedding_model(n_docs: int = 1, dim: int = 3):
+    """EmbeddingModel stand-in whose encode() returns fixed vectors."""
+    model = MagicMock(spec=EmbeddingModel)
+    model.embeddings = MagicMock()
+    model.encode.return_value = np.ones((n_docs, dim), dtype=np.float32)
+    return model
+
+
 def test_vector_store_manager_create_index_for_earthquake_docs():
-    with patch("src.vectorizer.FAISS") as MockFAISS:
-        mock_embedding_model = MagicMock()
+    with patch("langchain_community.vectorstores.FAISS") as MockFAISS:
+        mock_embedding_model = _mock_embedding_model(n_docs=1)
         manager = VectorStoreManager(embedding_model=mock_embedding_model)
 
         docs = [
@@ -64,15 +256,166 @@ def test_vector_store_manager_create_index_for_earthquake_docs():
 
         manager.create_index(docs)
 
-        MockFAISS.from_documents.assert_called_once_with(
-            docs,
-            mock_embedding_model.embeddings
-        )
+        # All chunks are embedded in a single batched call
+        mock_embedding_model.encode.assert_called_once()
+        texts = mock_embedding_model.encode.call_args[0][0]
+        assert texts == ["Event ID: 123 - Magnitudo 4.1"]
+
+        MockFAISS.assert_called_once()
+        _, kwargs = MockFAISS.call_args
+        assert kwargs["embedding_function"] is mock_embedding_model.embeddings
+        assert kwargs["index"].ntotal == 1
+
+        doc_id = kwargs["index_to_docstore_id"][0]
+        stored = kwargs["docstore"].search(doc_id)
+        assert stored.page_content == "Event ID: 123 - Magnitudo 4.1"
+        assert stored.metadata == {"event_id": "123"}
+
+
+def test_vector_store_manager_uses_hnsw_for_small_corpora():
+    with patch("langchain_community.vectorstores.FAISS") as MockFAISS:
+        mock_embedding_model = _mock_embedding_model(n_docs=3)
+        manager = VectorStoreManager(embedding_model=mock_embedding_model)
+
+        docs = [Document(page_content=f"Event {i}") for i in range(3)]
+        manager.create_index(docs)
+
+        index = MockFAISS.call_args.kwargs["index"]
+        assert isinstance(index, faiss.IndexHNSWFlat)
+        assert index.hnsw.efSearch == VectorStoreManager.HNSW_EF_SEARCH
+        assert index.hnsw.efConstruction == VectorStoreManager.HNSW_EF_CONSTRUCTION
+
+
+def test_vector_store_manager_uses_ivfpq_for_large_corpora():
+    n_docs, dim = 2_000, 32
+    rng = np.random.default_rng(0)
+    # Clustered unit vectors, like sentence embeddings of similar catalog rows
+    centers = rng.standard_normal((50, dim))
+    embs = centers[rng.integers(0, 50, n_docs)] + 0.5 * rng.standard_normal((n_docs, dim))
+    embs = (embs / np.linalg.norm(embs, axis=1, keepdims=True)).astype(np.float32)
+    mock_embedding_model = _mock_embedding_model()
+    mock_embedding_model.encode.return_value = embs
+
+    with patch("langchain_community.vectorstores.FAISS") as MockFAISS, \
+            patch.object(VectorStoreManager, "IVF_PQ_MIN_DOCS", n_docs - 1), \
+            patch.object(VectorStoreManager, "IVF_PQ_M", 8):
+        manager = VectorStoreManager(embedding_model=mock_embedding_model)
+        manager.create_index([Document(page_content=f"Event {i}") for i in range(n_docs)])
+
+        index = MockFAISS.call_args.kwargs["index"]
+        assert isinstance(index, faiss.IndexRefineFlat)
+        assert index.k_factor == VectorStoreManager.IVF_REFINE_K_FACTOR
+        ivf = faiss.downcast_index(index.base_index)
+        assert isinstance(ivf, faiss.IndexIVFPQ)
+        assert index.metric_type == ivf.metric_type == faiss.METRIC_INNER_PRODUCT
+        assert ivf.nlist == int(4 * np.sqrt(n_docs))
+        assert ivf.pq.M == 8
+        assert ivf.nprobe == VectorStoreManager.IVF_NPROBE
+        assert index.ntotal == n_docs
+
+        # Re-ranked PQ search finds (nearly) the exact top 8
+        queries = embs[rng.choice(n_docs, 100, replace=False)]
+        exact = faiss.IndexFlatIP(dim)
+        exact.add(embs)
+        _, expected = exact.search(queries, 8)
+        _, found = index.search(queries, 8)
+        recall = np.mean([len(set(e) & set(f)) / 8 for e, f in zip(expected, found)])
+        assert recall >= 0.9
+
+        manager.vector_store = MockFAISS.return_value
+        manager.vector_store.index = index
+
+        # Per-call nprobe keeps the refine step
+        params = manager.search_params(nprobe=32)
+        assert params.k_factor == VectorStoreManager.IVF_REFINE_K_FACTOR
+        _, with_params = index.search(queries, 8, params=params)
+        assert ivf.nprobe == VectorStoreManager.IVF_NPROBE
+        assert np.mean([len(set(e) & set(f)) / 8 for e, f in zip(expected, with_params)]) >= recall
+
+        manager.set_nprobe(32)
+        assert ivf.nprobe == 32
+
+
+def test_vector_store_manager_ivfpq_threshold_is_exclusive():
+    n_docs, dim = 64, 48
+    mock_embedding_model = _mock_embedding_model()
+    mock_embedding_model.encode.return_value = (
+        np.random.default_rng(0).standard_normal((n_docs, dim)).astype(np.float32)
+    )
+
+    with patch("langchain_community.vectorstores.FAISS") as MockFAISS, \
+            patch.object(VectorStoreManager, "IVF_PQ_MIN_DOCS", n_docs):
+        manager = VectorStoreManager(embedding_model=mock_embedding_model)
+        manager.create_index([Document(page_content=f"Event {i}") for i in range(n_docs)])
+
+        assert isinstance(MockFAISS.call_args.kwargs["index"], faiss.IndexHNSWFlat)
+
+
+def test_vector_store_manager_restores_faiss_thread_count(monkeypatch):
+    monkeypatch.delenv("OMP_NUM_THREADS", raising=False)
+    previous = faiss.omp_get_max_threads()
+    faiss.omp_set_num_threads(1)
+    try:
+        with patch("langchain_community.vectorstores.FAISS"):
+            manager = VectorStoreManager(embedding_model=_mock_embedding_model(n_docs=3))
+            manager.create_index([Document(page_content=f"Event {i}") for i in range(3)])
+        assert faiss.omp_get_max_threads() == 1
+
+        # An explicit OMP_NUM_THREADS is never overridden
+        monkeypatch.setenv("OMP_NUM_THREADS", "1")
+        with patch("langchain_community.vectorstores.FAISS"), \
+                patch("faiss.omp_set_num_threads") as mock_set_threads:
+            manager.create_index([Document(page_content=f"Event {i}") for i in range(3)])
+        mock_set_threads.assert_not_called()
+    finally:
+        faiss.omp_set_num_threads(previous)
+
+
+def test_vector_store_manager_set_ef_search():
+    with patch("langchain_community.vectorstores.FAISS") as MockFAISS:
+        manager = VectorStoreManager(embedding_model=_mock_embedding_model(n_docs=3))
+        manager.create_index([Document(page_content=f"Event {i}") for i in range(3)])
+        manager.vector_store = MockFAISS.return_value
+        manager.vector_store.index = MockFAISS.call_args.kwargs["index"]
+
+        manager.set_ef_search(128)
+
+        assert manager.index.hnsw.efSearch == 128
+
+
+def test_vector_store_manager_search_params_match_index_type():
+    with patch("langchain_community.vectorstores.FAISS") as MockFAISS:
+        manager = VectorStoreManager(embedding_model=_mock_embedding_model(n_docs=3))
+        manager.create_index([Document(page_content=f"Event {i}") for i in range(3)])
+        manager.vector_store = MockFAISS.return_value
+        manager.vector_store.index = MockFAISS.call_args.kwargs["index"]
+
+        params = manager.search_params(ef_search=128)
+
+        assert isinstance(params, faiss.SearchParametersHNSW)
+        assert params.efSearch == 128
+        assert manager.search_params() is None
+        # nprobe does not apply to HNSW
+        assert manager.search_params(nprobe=8) is None
+        # The shared index keeps its build-time beam
+        assert manager.index.hnsw.efSearch == VectorStoreManager.HNSW_EF_SEARCH
+
+
+def test_vector_store_manager_uses_inner_product_metric():
+    with patch("langchain_community.vectorstores.FAISS") as MockFAISS:
+        mock_embedding_model = _mock_embedding_model(n_docs=2)
+        manager = VectorStoreManager(embedding_model=mock_embedding_model)
+
+        manager.create_index([Document(page_content="A"), Document(page_content="B")])
+
+        _, kwargs = MockFAISS.call_args
+        assert kwargs["index"].metric_type == faiss.METRIC_INNER_PRODUCT
+        assert kwargs["distance_strategy"] == DistanceStrategy.MAX_INNER_PRODUCT
 
 
 def test_vector_store_manager_add_earthquake_documents():
-    with patch("src.vectorizer.FAISS") as MockFAISS:
-        mock_embedding_model = MagicMock()
+    with patch("langchain_community.vectorstores.FAISS") as MockFAISS:
+        mock_embedding_model = _mock_embedding_model()
         manager = VectorStoreManager(embedding_model=mock_embedding_model)
 
         # Simulate existing FAISS vector index
@@ -90,8 +433,8 @@ def test_vector_store_manager_add_earthquake_documents():
 
 
 def test_vector_store_metadata_preserved_for_earthquake_events():
-    with patch("src.vectorizer.FAISS") as MockFAISS:
-        mock_embedding_model = MagicMock()
+    with patch("langchain_community.vectorstores.FAISS") as MockFAISS:
+        mock_embedding_model = _mock_embedding_model(n_docs=2)
         manager = VectorStoreManager(embedding_model=mock_embedding_model)
 
         docs = [
@@ -107,10 +450,135 @@ def test_vector_store_metadata_preserved_for_earthquake_events():
 
         manager.create_index(docs)
 
-        args, _ = MockFAISS.from_documents.call_args
-        passed_docs = args[0]
+        _, kwargs = MockFAISS.call_args
+        docstore = kwargs["docstore"]
+        id_map = kwargs["index_to_docstore_id"]
+        passed_docs = [docstore.search(id_map[i]) for i in range(2)]
 
         assert passed_docs[0].metadata["event_id"] == "111"
         assert passed_docs[0].metadata["latitude"] == 40.12
         assert passed_docs[1].metadata["event_id"] == "222"
-        assert passed_docs[1].metadata["latitude"] == 38.90
\ No newline at end of file
+        assert passed_docs[1].metadata["latitude"] == 38.90
+
+def test_vector_store_manager_embeds_duplicate_chunks_once():
+    with patch("langchain_community.vectorstores.FAISS") as MockFAISS:
+        mock_embedding_model = _mock_embedding_model(n_docs=2)
+        manager = VectorStoreManager(embedding_model=mock_embedding_model)
+
+        docs = [
+            Document(page_content="M 3.1 - Sicily", metadata={"event_id": "111"}),
+            Document(page_content="M 2.0 - Calabria", metadata={"event_id": "222"}),
+            Document(page_content="M 3.1 - Sicily", metadata={"event_id": "333"}),
+        ]
+
+        manager.create_index(docs)
+
+        texts = mock_embedding_model.encode.call_args[0][0]
+        assert texts == ["M 3.1 - Sicily", "M 2.0 - Calabria"]
+
+        _, kwargs = MockFAISS.call_args
+        assert kwargs["index"].ntotal == 2
+        first = kwargs["docstore"].search(kwargs["index_to_docstore_id"][0])
+        second = kwargs["docstore"].search(kwargs["index_to_docstore_id"][1])
+        assert first.metadata == {"event_id": "111", "event_ids": ["111", "333"]}
+        assert second.metadata == {"event_id": "222"}
+
+
+def test_get_embedding_model_is_shared_across_managers():
+    with patch("langchain_community.embeddings.HuggingFaceEmbeddings") as MockEmbeddings, \
+            patch.dict("src.vectorizer._EMB_CACHE", clear=True):
+        first = VectorStoreManager()
+        second = VectorStoreManager()
+
+        assert first.embedding_model is second.embedding_model
+        assert first.embedding_model is get_embedding_model()
+        MockEmbeddings.assert_called_once()
+
+        # Warmed up once, when the shared model is first built
+        MockEmbeddings.return_value.embed_query.assert_called_once_with("warmup")
+
+
+def test_get_embedding_model_keyed_by_configuration():
+    with patch("langchain_community.embeddings.HuggingFaceEmbeddings") as MockEmbeddings, \
+            patch("src.vectorizer.HalfPrecisionEmbeddings") as MockHalf, \
+            patch("src.vectorizer._default_device", return_value="cpu"), \
+            patch.dict("src.vectorizer._EMB_CACHE", clear=True):
+        fp32 = get_embedding_model(precision="fp32")
+        bf16 = get_embedding_model(precision="bf16")
+
+        assert fp32 is get_embedding_model()
+        assert bf16 is get_embedding_model(precision="bf16")
+        assert fp32 is not bf16
+        MockEmbeddings.assert_called_once()
+        MockHalf.assert_called_once()
+
+        clear_embedding_cache()
+        assert get_embedding_model() is not fp32
+        assert MockEmbeddings.call_count == 2
+
+
+def test_vector_store_manager_save_and_load_roundtrip(tmp_path):
+    mock_embedding_model = _mock_embedding_model(n_docs=2)
+    mock_embedding_model.encode.return_value = np.eye(2, 3, dtype=np.float32)
+    manager = VectorStoreManager(embedding_model=mock_embedding_model)
+    manager.create_index([
+        Document(page_content="Event ID: 1", metadata={"event_id": "1"}),
+        Document(page_content="Event ID: 2", metadata={"event_id": "2"}),
+    ])
+
+    manager.save(str(tmp_path))
+
+    restored = VectorStoreManager(embedding_model=mock_embedding_model)
+    restored.load(str(tmp_path))
+
+    assert restored.index.ntotal == 2
+    assert restored.vector_store.distance_strategy == DistanceStrategy.MAX_INNER_PRODUCT
+    doc = restored.vector_store.docstore.search(restored.index_to_docstore_id[1])
+    assert doc.metadata == {"event_id": "2"}
+
+    # Both loaders see the same index
+    copied = VectorStoreManager(embedding_model=mock_embedding_model)
+    copied.load(str(tmp_path), mmap=False)
+    assert copied.index.ntotal == 2
+    assert copied.index_to_docstore_id == restored.index_to_docstore_id
+
+
+def test_vector_store_manager_load_without_mmap_ifc(tmp_path, monkeypatch):
+    # faiss < 1.11 has no IO_FLAG_MMAP_IFC
+    monkeypatch.delattr(faiss, "IO_FLAG_MMAP_IFC")
+    mock_embedding_model = _mock_embedding_model(n_docs=2)
+    mock_embedding_model.encode.return_value = np.eye(2, 3, dtype=np.float32)
+    manager = VectorStoreManager(embedding_model=mock_embedding_model)
+    manager.create_index([Document(page_content=f"Event ID: {i}") for i in range(2)])
+    manager.save(str(tmp_path))
+
+    restored = VectorStoreManager(embedding_model=mock_embedding_model)
+    restored.load(str(tmp_path))
+
+    assert restored.index.ntotal == 2
+
+
+def test_vector_store_manager_save_over_mmapped_index(tmp_path):
+    mock_embedding_model = _mock_embedding_model(n_docs=3)
+    mock_embedding_model.encode.return_value = np.eye(3, 4, dtype=np.float32)
+    manager = VectorStoreManager(embedding_model=mock_embedding_model)
+    manager.create_index([Document(page_content=f"Event ID: {i}") for i in range(3)])
+    index_dir = str(tmp_path / "index")
+    manager.save(index_dir)
+
+    mapped = VectorStoreManager(embedding_model=mock_embedding_model)
+    mapped.load(index_dir)
+    query = np.eye(1, 4, dtype=np.float32)
+    _, before = mapped.index.search(query, 3)
+
+    # Rebuild and save over the directory the first index is mapped from
+    mock_embedding_model.encode.return_value = np.eye(3, 4, k=1, dtype=np.float32)
+    manager.create_index([Document(page_content=f"Event ID: {i}") for i in range(3)])
+    manager.save(index_dir)
+
+    _, after = mapped.index.search(query, 3)
+    np.testing.assert_array_equal(before, after)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["index"]
+
+    with pytest.raises(ValueError):
+        mapped.add_documents([Document(page_content="Event ID: 9")])